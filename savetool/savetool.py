@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 
 """
-Tool for working with Dead Cells save files. Allows verification, extraction, repacking, and basic conversion.
+Tool for working with Dead Cells save files. Allows verification, extraction, repacking, basic conversion, batch auditing, JSON export/import, and selector queries.
 """
 
 import hashlib
 import argparse
 import difflib
+import glob
+import json
 import sys
 import zlib
 from pathlib import Path
@@ -17,6 +19,9 @@ import os
 import struct
 import toml
 import datetime
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Iterator
 
 # --- Constants and Maps ---
 MAGIC_NUMBER = 0x11CEADDE # DE AD CE 11
@@ -417,6 +422,22 @@ def handle_convert(args: argparse.Namespace):
             print(f"\n[*] Packing into output save file: '{args.output_file}'")
             handle_repack(repack_args)
 
+@lru_cache(maxsize=None)
+def _hxbit_schema_cache():
+    """
+    The schema table cache shared by every hxbit parse in this process. It
+    persists to ~/.cache/alivecells/hxbit-schemas so that later runs (and
+    batch workers) skip re-parsing schema headers they have seen before.
+    Files parsed with it share their schema objects, which savetool only
+    reads. Set SAVETOOL_NO_SCHEMA_CACHE to keep it in memory only.
+    """
+    from hxbit.core import DiskSchemaTableCache, SchemaTableCache
+
+    if os.environ.get("SAVETOOL_NO_SCHEMA_CACHE"):
+        return SchemaTableCache()
+    return DiskSchemaTableCache()
+
+
 def _hxbit_schema_map(chunk_data: bytes) -> dict[str, list[str]]:
     """
     Parses an hxbit chunk and returns a map of class name to a list of
@@ -425,7 +446,7 @@ def _hxbit_schema_map(chunk_data: bytes) -> dict[str, list[str]]:
     """
     from hxbit.core import HXSFile
 
-    hxs = HXSFile.from_bytes(chunk_data, shims="deadcells")
+    hxs = HXSFile.from_bytes(chunk_data, shims="deadcells", schema_cache=_hxbit_schema_cache())
     schema_map: dict[str, list[str]] = {}
     for schema in hxs.schemas:
         if schema.classdef and schema.classdef.name.value:
@@ -441,6 +462,100 @@ def _hxbit_schema_map(chunk_data: bytes) -> dict[str, list[str]]:
     return schema_map
 
 
+def _audit_save(path: str) -> dict:
+    """
+    Decompresses and parses one save file for batch_parse_saves. Runs in a
+    worker process and never raises: failures are reported in the result.
+    """
+    from hxbit.core import HXSFile
+
+    result = {'path': path, 'header': None, 'checksum_valid': None, 'chunks': [], 'error': None}
+    try:
+        with open(path, 'rb') as f:
+            save_data = f.read()
+        header, chunks = parse_save_bytes(save_data)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    data_for_hashing = bytearray(save_data)
+    data_for_hashing[CHECKSUM_OFFSET:CHECKSUM_OFFSET + CHECKSUM_SIZE] = b'\x00' * CHECKSUM_SIZE
+    result['checksum_valid'] = hashlib.sha1(data_for_hashing).digest() == header['stored_checksum']
+    result['header'] = {
+        'version': header['version'],
+        'git_hash': header['git_hash'].hex(),
+        'build_date': header['build_date'],
+        'flags': header['flags'],
+    }
+    for bit, chunk_data in sorted(chunks.items()):
+        chunk = {'bit': bit, 'name': SAVE_CONTENT_MAP[bit], 'size': len(chunk_data)}
+        if bit in HXBIT_CHUNK_BITS:
+            chunk['roots'] = []
+            chunk['parse_error'] = None
+            try:
+                # Lazy: only the root classes are needed, not every object's fields.
+                hxs = HXSFile.from_bytes(
+                    chunk_data, shims="deadcells", lazy=True, schema_cache=_hxbit_schema_cache()
+                )
+            except Exception as e:
+                chunk['parse_error'] = f"{type(e).__name__}: {e}"
+            else:
+                chunk['roots'] = [
+                    root.schema.classdef.name.value if root.schema.classdef else None
+                    for root in hxs.roots
+                ]
+                if hxs.object_parse_error is not None:
+                    chunk['parse_error'] = f"{type(hxs.object_parse_error).__name__}: {hxs.object_parse_error}"
+        result['chunks'].append(chunk)
+    return result
+
+
+def _expand_save_paths(sources: Iterable[str | Path], pattern: str = "*") -> list[str]:
+    """
+    Expands files, directories (searched recursively for `pattern`) and glob
+    patterns into file paths. A source that is none of these, or a pattern
+    matching no files, is kept as it is, so reading it reports the error.
+    """
+    paths: list[str] = []
+    for source in sources:
+        source_path = Path(source)
+        if source_path.is_dir():
+            paths.extend(str(p) for p in sorted(source_path.rglob(pattern)) if p.is_file())
+        elif source_path.is_file():
+            paths.append(str(source_path))
+        else:
+            matches = [p for p in sorted(glob.glob(str(source), recursive=True)) if os.path.isfile(p)]
+            paths.extend(matches or [str(source)])
+    return paths
+
+
+def batch_parse_saves(sources: Iterable[str | Path] | str | Path, workers: int | None = None,
+                      pattern: str = "*", chunksize: int = 8) -> Iterator[dict]:
+    """
+    Parses many save files in parallel, yielding one result dict per file, in
+    input order, as soon as it is ready.
+
+    Args:
+        sources: Save files, directories (searched recursively for files
+            matching `pattern`) and/or glob patterns.
+        workers: Number of worker processes (defaults to the CPU count).
+        pattern: File name pattern used when searching directories.
+        chunksize: Files handed to a worker at a time.
+
+    Each result has the file's 'path', its 'header' (version, git_hash,
+    build_date, flags), 'checksum_valid', a list of 'chunks' ('bit', 'name',
+    'size', plus 'roots' class names and 'parse_error' for hxbit chunks)
+    and an 'error' if the file could not be read or decompressed at all.
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+    paths = _expand_save_paths(sources, pattern)
+    if not paths:
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_audit_save, paths, chunksize=chunksize)
+
+
 def handle_schemadiff(args: argparse.Namespace):
     """Handler for the 'schemadiff' subcommand to compare hxbit schemas between two save files."""
     path_a = Path(args.save_file_a)
@@ -531,6 +646,213 @@ def handle_schemadiff(args: argparse.Namespace):
         print(f"\n[+] No schema differences found between {path_a.name} (A) and {path_b.name} (B).")
 
 
+def handle_batch(args: argparse.Namespace):
+    """Handler for the 'batch' subcommand to audit many save files in parallel."""
+    total = failed = 0
+    for result in batch_parse_saves(args.sources, workers=args.jobs, pattern=args.pattern):
+        total += 1
+        chunk_errors = [c for c in result['chunks'] if c.get('parse_error')]
+        if result['error'] or chunk_errors or result['checksum_valid'] is False:
+            failed += 1
+        if args.json:
+            print(json.dumps(result), flush=True)
+            continue
+        if result['error']:
+            print(f"[!] {result['path']}: {result['error']}")
+            continue
+        header = result['header']
+        checksum = "OK" if result['checksum_valid'] else "BAD CHECKSUM"
+        print(f"[*] {result['path']}: v{header['version']} {header['build_date']} ({checksum})")
+        for chunk in result['chunks']:
+            line = f"    - {chunk['name']:<18} {chunk['size']:>8} bytes"
+            if 'roots' in chunk:
+                line += f"  roots: {', '.join(str(r) for r in chunk['roots']) or '-'}"
+            if chunk.get('parse_error'):
+                line += f"  [!] {chunk['parse_error']}"
+            print(line)
+
+    print(f"\n[*] {total} file(s) processed, {failed} with problems.", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+def _open_output(path: str):
+    """Opens `path` for writing text, or returns stdout for '-'."""
+    if path == '-':
+        return sys.stdout
+    return open(path, 'w', encoding='utf-8')
+
+
+def handle_export(args: argparse.Namespace):
+    """
+    Handler for the 'export' subcommand. Dumps the object graph of each
+    hxbit chunk with every object once, keyed by UID, and references as
+    {"$ref": uid}. NDJSON output has one line per object, written as the
+    graph is walked. The output is strict JSON: NaN and infinite floats are
+    written as {"$float": "nan"} and the like.
+    """
+    from hxbit.core import HXSFile
+
+    save_file_path = Path(args.save_file)
+    if not save_file_path.is_file():
+        print(f"[!] Error: File not found at '{save_file_path}'", file=sys.stderr)
+        sys.exit(1)
+
+    with open(save_file_path, 'rb') as f:
+        _, chunks = parse_save_bytes(f.read())
+    bits = [
+        bit for bit in sorted(HXBIT_CHUNK_BITS)
+        if bit in chunks and (not args.chunk or SAVE_CONTENT_MAP[bit] in args.chunk)
+    ]
+    if not bits:
+        print("[!] Error: No hxbit chunks to export.", file=sys.stderr)
+        sys.exit(1)
+
+    parsed = {}
+    for bit in bits:
+        name = SAVE_CONTENT_MAP[bit]
+        hxs = HXSFile.from_bytes(chunks[bit], shims="deadcells", schema_cache=_hxbit_schema_cache())
+        if hxs.object_parse_error is not None:
+            print(f"[!] Error: Could not parse the objects of {name}: {hxs.object_parse_error}", file=sys.stderr)
+            sys.exit(1)
+        parsed[name] = hxs
+
+    out = _open_output(args.output_file)
+    try:
+        if args.format == 'ndjson':
+            for name, hxs in parsed.items():
+                out.write(json.dumps({'chunk': name, 'roots': hxs.root_uids()}, allow_nan=False) + "\n")
+                count = 0
+                for record in hxs.iter_json_records():
+                    out.write(json.dumps({'chunk': name, **record}, allow_nan=False) + "\n")
+                    count += 1
+                print(f"[*] Exported {name}: {count} object(s)", file=sys.stderr)
+        else:
+            document = {'chunks': {name: hxs.to_json() for name, hxs in parsed.items()}}
+            json.dump(document, out, indent=args.indent, allow_nan=False)
+            out.write("\n")
+            for name, doc in document['chunks'].items():
+                print(f"[*] Exported {name}: {len(doc['objects'])} object(s)", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def _read_json_export(path: str, fmt: str) -> dict:
+    """
+    Reads a file written by 'export' into {chunk_name: {"roots": [...],
+    "records": [...]}}. With fmt 'auto', NDJSON is recognised by its
+    per-line "chunk" keys.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    if fmt == 'auto':
+        first_line = text.lstrip().split("\n", 1)[0]
+        try:
+            fmt = 'ndjson' if 'chunk' in json.loads(first_line) else 'json'
+        except json.JSONDecodeError:
+            fmt = 'json'
+
+    chunks: dict = {}
+    if fmt == 'ndjson':
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            chunk = chunks.setdefault(record.pop('chunk'), {'roots': [], 'records': []})
+            if 'roots' in record:
+                chunk['roots'] = record['roots']
+            else:
+                chunk['records'].append(record)
+    else:
+        for name, document in json.loads(text)['chunks'].items():
+            chunks[name] = {
+                'roots': document['roots'],
+                'records': [
+                    {'uid': int(uid), 'class': obj['class'], 'fields': obj['fields']}
+                    for uid, obj in document['objects'].items()
+                ],
+            }
+    return chunks
+
+
+def handle_import(args: argparse.Namespace):
+    """
+    Handler for the 'import' subcommand. Rebuilds the hxbit chunks found in a
+    JSON/NDJSON export (possibly edited) with the schemas of the original
+    save file, and writes a new save with everything else left as it was.
+    """
+    from hxbit.core import HXSFile
+
+    save_file_path = Path(args.save_file)
+    if not save_file_path.is_file():
+        print(f"[!] Error: File not found at '{save_file_path}'", file=sys.stderr)
+        sys.exit(1)
+
+    with open(save_file_path, 'rb') as f:
+        header, chunks = parse_save_bytes(f.read())
+    imported = _read_json_export(args.json_file, args.format)
+
+    bits_by_name = {SAVE_CONTENT_MAP[bit]: bit for bit in HXBIT_CHUNK_BITS}
+    for name, chunk in imported.items():
+        bit = bits_by_name.get(name)
+        if bit is None or bit not in chunks:
+            print(f"[!] Error: {save_file_path.name} has no {name} chunk to import into.", file=sys.stderr)
+            sys.exit(1)
+        # Only the schemas are needed: a lazy parse is the cheapest way to get them.
+        hxs = HXSFile.from_bytes(chunks[bit], shims="deadcells", lazy=True, schema_cache=_hxbit_schema_cache())
+        try:
+            hxs.load_json_records(chunk['roots'], chunk['records'])
+            chunks[bit] = hxs.serialise()
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"[!] Error: Could not rebuild {name}: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"[*] Rebuilt {name} from {len(chunk['records'])} object(s) ({len(chunks[bit])} bytes)")
+
+    with open(args.output_file, 'wb') as f:
+        f.write(build_save_bytes(
+            header['version'], header['git_hash'], header['build_date'], header['flags'], chunks,
+        ))
+    print(f"[+] Wrote {args.output_file}")
+
+
+def handle_query(args: argparse.Namespace):
+    """
+    Handler for the 'query' subcommand. Prints every value matching a
+    selector (see hxbit.query) in the hxbit chunks of each save file. The
+    selector is compiled once, and chunks are parsed lazily so only the
+    objects it leads to are decoded.
+    """
+    from hxbit.core import HXSFile
+    from hxbit.query import SelectorError, compile_selector
+
+    try:
+        selector = compile_selector(args.selector)
+    except SelectorError as e:
+        print(f"[!] Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    matches = 0
+    for path in args.save_files:
+        try:
+            with open(path, 'rb') as f:
+                _, chunks = parse_save_bytes(f.read())
+        except (OSError, ValueError) as e:
+            print(f"[!] {path}: {e}", file=sys.stderr)
+            continue
+        for bit in sorted(HXBIT_CHUNK_BITS):
+            name = SAVE_CONTENT_MAP[bit]
+            if bit not in chunks or (args.chunk and name not in args.chunk):
+                continue
+            hxs = HXSFile.from_bytes(chunks[bit], shims="deadcells", schema_cache=_hxbit_schema_cache(), lazy=True)
+            if hxs.object_parse_error is not None:
+                print(f"[!] {path}: could not parse the objects of {name}: {hxs.object_parse_error}", file=sys.stderr)
+                continue
+            for value in selector.select(hxs):
+                print(f"{path}\t{name}\t{value!r}")
+                matches += 1
+    print(f"[*] {matches} match(es) in {len(args.save_files)} file(s)", file=sys.stderr)
+
+
 def handle_edit(args: argparse.Namespace):
     import datetime as _dt
     import tkinter as tk
@@ -627,7 +949,9 @@ def handle_edit(args: argparse.Namespace):
             tab.columnconfigure(0, weight=1)
             tab.rowconfigure(0, weight=1)
             try:
-                hxs = HXSFile.from_bytes(self.chunks[bit], shims="deadcells")
+                hxs = HXSFile.from_bytes(
+                    self.chunks[bit], shims="deadcells", schema_cache=_hxbit_schema_cache()
+                )
             except Exception as e:
                 ttk.Label(tab, text=f"Failed to parse {name} as hxbit data:\n{e}").grid(
                     row=0, column=0, sticky="nw"
@@ -783,6 +1107,35 @@ def main():
     schemadiff_parser.add_argument('save_file_b', help='Path to the second save file.')
     schemadiff_parser.set_defaults(func=handle_schemadiff)
 
+    batch_parser = subparsers.add_parser('batch', help='Parse many save files in parallel and report headers, chunks, root classes and errors.')
+    batch_parser.add_argument('sources', nargs='+', help='Save files, directories, or glob patterns.')
+    batch_parser.add_argument('-j', '--jobs', type=int, default=None, help='Number of worker processes (default: CPU count).')
+    batch_parser.add_argument('--pattern', default='*', help="File name pattern used when searching directories (default: '*').")
+    batch_parser.add_argument('--json', action='store_true', help='Print one JSON object per file (NDJSON) instead of a summary.')
+    batch_parser.set_defaults(func=handle_batch)
+
+    hxbit_chunk_names = [SAVE_CONTENT_MAP[bit] for bit in sorted(HXBIT_CHUNK_BITS)]
+    export_parser = subparsers.add_parser('export', help='Export the hxbit object graphs of a save file as JSON or NDJSON.')
+    export_parser.add_argument('save_file', help='Path to the save file to export.')
+    export_parser.add_argument('output_file', nargs='?', default='-', help="Path to write to, or '-' for stdout (default).")
+    export_parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='One document, or one JSON object per line (default: json).')
+    export_parser.add_argument('--chunk', action='append', choices=hxbit_chunk_names, help='Only export this chunk (repeatable; default: all hxbit chunks present).')
+    export_parser.add_argument('--indent', type=int, default=None, help='Indent JSON output by this many spaces (default: compact).')
+    export_parser.set_defaults(func=handle_export)
+
+    import_parser = subparsers.add_parser('import', help="Rebuild the hxbit chunks of a save file from an 'export' JSON or NDJSON file.")
+    import_parser.add_argument('save_file', help='Path to the original save file (provides schemas and all other chunks).')
+    import_parser.add_argument('json_file', help='Path to the JSON or NDJSON export to import.')
+    import_parser.add_argument('output_file', help='Path for the rebuilt save file.')
+    import_parser.add_argument('--format', choices=['auto', 'json', 'ndjson'], default='auto', help='Format of json_file (default: detect).')
+    import_parser.set_defaults(func=handle_import)
+
+    query_parser = subparsers.add_parser('query', help="Print the values matching a selector, e.g. '//BossRushData/unlockedGameMode[unlock=true]', in one or more save files.")
+    query_parser.add_argument('selector', help='The selector to match (see hxbit/query.py for the syntax).')
+    query_parser.add_argument('save_files', nargs='+', help='Paths to the save files to search.')
+    query_parser.add_argument('--chunk', action='append', choices=hxbit_chunk_names, help='Only search this chunk (repeatable; default: all hxbit chunks present).')
+    query_parser.set_defaults(func=handle_query)
+
     edit_parser = subparsers.add_parser('edit', help='Open a GUI editor for all chunks and metadata of a save file.')
     edit_parser.add_argument('save_file', help='Path to the save file to edit.')
     edit_parser.set_defaults(func=handle_edit)
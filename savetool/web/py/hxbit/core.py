@@ -1,20 +1,42 @@
-
 from abc import ABC, abstractmethod
 from io import BytesIO
-from typing import Any, Dict, Optional, Set, Tuple, Union, BinaryIO, Literal, TypeVar, List
+from typing import Any, Callable, Dict, Generator, Iterable, Iterator, NamedTuple, Optional, Set, TextIO, Tuple, Union, BinaryIO, Literal, TypeVar, List
 import struct
+import base64
+import hashlib
 import inspect
+import sys
+import json
+import math
+import warnings
+import pickle
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+import os
+import zlib
+from array import array
 from enum import Enum
+from types import FunctionType, GeneratorType, ModuleType
 
 from . import shims
 from .debug import DEBUG
 
+try:
+    import numpy  # optional, for primitive_arrays="numpy"
+except ImportError:
+    numpy = None
+
 T = TypeVar("T", bound="VarInt")
 
 
+@lru_cache(maxsize=None)
 def hxbit_hash(name: str) -> int:
     """
     Reimplements the hxbit.Serializer.hash method - takes a string (fully qualified class name) and returns a hashed int.
+    Results are memoised, since the same few hundred class names are hashed over and over.
     """
     v = 1
     for char in name:
@@ -28,6 +50,344 @@ def hxbit_hash(name: str) -> int:
     return v
 
 
+_U16_BE = struct.Struct(">H")
+_I32 = struct.Struct("<i")
+_I64 = struct.Struct("<q")
+_F32 = struct.Struct("<f")
+_F64 = struct.Struct("<d")
+_BOOL_BYTES = bytes([0] + [1] * 255)  # translate() table: any non-zero byte -> 1
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+class ByteReader:
+    """
+    A read cursor over an in-memory buffer.
+
+    Implements the part of the BytesIO interface the deserialisers rely on
+    (read/tell/seek/getbuffer), plus primitives that decode straight out of
+    a memoryview with indexing and `unpack_from` instead of allocating a
+    bytes object for every tag byte or word.
+    """
+
+    __slots__ = ("buf", "pos", "end")
+
+    def __init__(self, data: bytes | bytearray | memoryview, pos: int = 0) -> None:
+        self.buf = memoryview(data).cast("B")
+        self.pos = pos
+        self.end = len(self.buf)
+
+    def read(self, n: int = -1) -> bytes:
+        start = self.pos
+        stop = self.end if n < 0 else min(start + n, self.end)
+        self.pos = stop
+        return self.buf[start:stop].tobytes()
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, pos: int, whence: int = 0) -> int:
+        if whence == 1:
+            pos += self.pos
+        elif whence == 2:
+            pos += self.end
+        self.pos = pos
+        return pos
+
+    def getbuffer(self) -> memoryview:
+        return self.buf
+
+    def advance(self, n: int, what: str = "data") -> int:
+        """Moves the cursor forward `n` bytes, returning the old position."""
+        if n < 0:
+            raise ValueError(f"Negative length {n} while reading {what}.")
+        pos = self.pos
+        if pos + n > self.end:
+            raise EOFError(f"Unexpected end of stream while reading {what}.")
+        self.pos = pos + n
+        return pos
+
+    def read_byte(self) -> int:
+        pos = self.pos
+        if pos >= self.end:
+            raise EOFError("Unexpected end of stream while reading byte.")
+        self.pos = pos + 1
+        return self.buf[pos]
+
+    def read_varint(self) -> int:
+        pos = self.pos
+        if pos >= self.end:
+            raise EOFError("Unexpected end of stream while reading VarInt tag.")
+        tag = self.buf[pos]
+        if tag != 0x80:
+            self.pos = pos + 1
+            return tag
+        if pos + 5 > self.end:
+            raise EOFError("Unexpected end of stream while reading 4-byte VarInt payload.")
+        self.pos = pos + 5
+        return _I32.unpack_from(self.buf, pos + 1)[0]
+
+    def read_string(self) -> str | None:
+        length_plus_one = self.read_varint()
+        if length_plus_one == 0:
+            return None
+        n = length_plus_one - 1
+        if n < 0:
+            raise ValueError(f"Negative string length {n}.")
+        pos = self.pos
+        if pos + n > self.end:
+            raise EOFError(
+                f"Expected {n} string bytes, but got {max(0, self.end - pos)}."
+            )
+        self.pos = pos + n
+        try:
+            return str(self.buf[pos:pos + n], "utf-8")
+        except UnicodeDecodeError as e:
+            raise ValueError(
+                f"Failed to decode string bytes: {self.buf[pos:pos + n].tobytes()!r}"
+            ) from e
+
+    def read_bytes(self) -> bytes | None:
+        length_plus_one = self.read_varint()
+        if length_plus_one == 0:
+            return None
+        if length_plus_one < 0:
+            raise ValueError(f"Negative bytes length {length_plus_one - 1}.")
+        return self.read(length_plus_one - 1)
+
+    def read_i32(self) -> int:
+        return _I32.unpack_from(self.buf, self.advance(4, "Int32"))[0]
+
+    def read_i64(self) -> int:
+        return _I64.unpack_from(self.buf, self.advance(8, "Int64"))[0]
+
+    def read_f32(self) -> float:
+        return _F32.unpack_from(self.buf, self.advance(4, "Float"))[0]
+
+    def read_f64(self) -> float:
+        return _F64.unpack_from(self.buf, self.advance(8, "Float64"))[0]
+
+    def read_u16_be(self) -> int:
+        return _U16_BE.unpack_from(self.buf, self.advance(2, "CLID"))[0]
+
+    # Bulk reads of `n` consecutive primitives, for homogeneous arrays.
+
+    def read_varints(self, n: int) -> List[int]:
+        if n < 0:
+            raise ValueError(f"Negative length {n} while reading Int array.")
+        pos = self.pos
+        if pos + n <= self.end:
+            chunk = self.buf[pos:pos + n].tobytes()
+            if b"\x80" not in chunk:  # all single-byte: the common case
+                self.pos = pos + n
+                return list(chunk)
+        read_varint = self.read_varint
+        return [read_varint() for _ in range(n)]
+
+    def read_f32s(self, n: int) -> array:
+        values = array("f")
+        pos = self.advance(4 * n, "Float array")
+        values.frombytes(self.buf[pos:pos + 4 * n])
+        if _BIG_ENDIAN:
+            values.byteswap()
+        return values
+
+    def read_bools(self, n: int) -> bytes:
+        """Returns one byte per value, normalised to 0 or 1."""
+        pos = self.advance(n, "Bool array")
+        return self.buf[pos:pos + n].tobytes().translate(_BOOL_BYTES)
+
+
+Readable = Union[BinaryIO, BytesIO, ByteReader]
+
+
+class ByteWriter:
+    """
+    The writing counterpart of ByteReader: appends to a growable bytearray
+    (which over-allocates as it grows, so appends are amortised O(1)), with
+    emitters that encode primitives in place instead of building a VarInt
+    or String and a temporary bytes object for each value.
+
+    `write` keeps the BytesIO interface for callers that already have bytes.
+    """
+
+    __slots__ = ("buf",)
+
+    def __init__(self, buf: bytearray | None = None) -> None:
+        self.buf = buf if buf is not None else bytearray()
+
+    def __len__(self) -> int:
+        return len(self.buf)
+
+    def tell(self) -> int:
+        return len(self.buf)
+
+    def write(self, data: bytes | bytearray | memoryview) -> int:
+        self.buf += data
+        return len(data)
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buf)
+
+    def write_byte(self, value: int) -> None:
+        self.buf.append(value)
+
+    def write_varint(self, value: int) -> None:
+        if 0 <= value < 0x80:
+            self.buf.append(value)
+        else:
+            self.buf.append(0x80)
+            self.buf += _I32.pack(value)
+
+    def write_string(self, value: str | None) -> None:
+        if value is None:
+            self.buf.append(0)
+            return
+        data = value.encode("utf-8")
+        self.write_varint(len(data) + 1)
+        self.buf += data
+
+    def write_bytes(self, value: bytes | None) -> None:
+        if value is None:
+            self.buf.append(0)
+            return
+        self.write_varint(len(value) + 1)
+        self.buf += value
+
+    def write_i32(self, value: int) -> None:
+        self.buf += _I32.pack(value)
+
+    def write_i64(self, value: int) -> None:
+        self.buf += _I64.pack(value)
+
+    def write_f32(self, value: float) -> None:
+        self.buf += _F32.pack(value)
+
+    def write_f64(self, value: float) -> None:
+        self.buf += _F64.pack(value)
+
+    def write_u16_be(self, value: int) -> None:
+        self.buf += _U16_BE.pack(value)
+
+    # Bulk writes; `values` may be a list, an array.array or a NumPy array.
+
+    def write_varints(self, values: Any) -> None:
+        if hasattr(values, "tolist"):
+            values = values.tolist()
+        try:
+            data = bytes(values)
+        except (ValueError, TypeError):
+            data = None
+        if data is not None and (not data or max(data) < 0x80):
+            self.buf += data
+            return
+        write_varint = self.write_varint
+        for value in values:
+            write_varint(value)
+
+    def write_f32s(self, values: Any) -> None:
+        if not (isinstance(values, array) and values.typecode == "f"):
+            values = array("f", values.tolist() if hasattr(values, "tolist") else values)
+        if _BIG_ENDIAN:
+            values = array("f", values)
+            values.byteswap()
+        self.buf += values.tobytes()
+
+    def write_bools(self, values: Any) -> None:
+        self.buf += bytes(map(bool, values))
+
+# Compiled decoders (see HXSFile._compile_reader): one closure per PropType.
+# They read from a ByteReader.
+Decoder = Callable[["HXSFile", ByteReader], Any]
+# Skippers (see HXSFile._compile_skipper): advance past a value without
+# building it, used by the lazy first pass.
+Skipper = Callable[["HXSFile", ByteReader], None]
+# Root schema probes (see HXSFile._compile_probe): return True if the value
+# was fully consumed, False if probing has to stop there, and raise if the
+# bytes can't be a value of that type at all.
+Probe = Callable[["HXSFile", ByteReader], bool]
+# Step generators (see walk): resumable traversals that keep unbounded
+# nesting, i.e. objects defined inside objects, off the Python call stack.
+Steps = Generator[Any, Any, Any]
+# Step decoders and skippers (see HXSFile._steps_for): like the above, but for
+# types that can hold object references they may return a step generator
+# producing the value instead, when that means reading object definitions.
+DecoderSteps = Callable[["HXSFile", ByteReader], Any]
+# The field-filling step generator compiled per Schema.
+ObjDecoderSteps = Callable[["HXSFile", ByteReader, Dict[str, Any]], Steps]
+SkipperSteps = Callable[["HXSFile", ByteReader], Steps | None]
+
+
+def _dynamic_count(count: int) -> int:
+    if count < 0:
+        raise ValueError(f"Invalid dynamic value count {count}.")
+    return count
+
+
+def _skip_dynamic_scalar(f: "ByteReader", tag: int) -> None:
+    """Steps over a dynamic value that can't nest (see HXSFile._read_dynamic)."""
+    if tag <= 2:
+        if tag < 0:
+            raise ValueError(f"Invalid dynamic type prefix: {tag}")
+    elif tag == 3:
+        f.read_varint()
+    elif tag == 4:
+        f.advance(4, "PDynamic")
+    elif tag == 6:
+        f.read_string()
+    elif tag == 8:
+        length = f.read_varint()
+        if length != 0:
+            f.advance(length - 1, "PDynamic")
+    elif tag == 10:
+        f.read_string()
+        f.read_varint()
+    else:
+        raise ValueError(f"Invalid dynamic type prefix: {tag}")
+
+
+def walk(steps: Steps) -> Any:
+    """
+    Runs a step generator to completion and returns its result.
+
+    A step generator yields another step generator to have it run the same
+    way, and is sent back that one's return value. Nesting bounded by the
+    schema (the containers of one value) may use `yield from`; anything that
+    can nest without bound is yielded instead, so a chain of N nested objects
+    costs N suspended generators on this explicit stack rather than several
+    Python frames per level, and never hits the recursion limit.
+    """
+    stack = [steps]
+    value = None
+    while True:
+        try:
+            child = stack[-1].send(value)
+        except StopIteration as done:
+            stack.pop()
+            if not stack:
+                return done.value
+            value = done.value
+        else:
+            stack.append(child)
+            value = None
+
+
+def stream(steps: Steps) -> Iterator[Any]:
+    """
+    Like walk, for step generators that produce output as they go: whatever
+    they yield that isn't a step generator is passed through in order. The
+    traversal only advances as far as the output is consumed.
+    """
+    stack = [steps]
+    while stack:
+        for item in stack[-1]:
+            if type(item) is GeneratorType:
+                stack.append(item)
+                break
+            yield item
+        else:
+            stack.pop()
+
+
 def tell(message: str | None = None) -> None:
     """
     Prints the current position in the file-like object.
@@ -52,11 +412,55 @@ def tell(message: str | None = None) -> None:
         print("WARNING: tell() called without a file-like object in locals.")
 
 
+def deep_sizeof(root: Any, exclude: Tuple[type, ...] = (), seen: Set[int] | None = None) -> int:
+    """
+    Approximate size in bytes of `root` and everything reachable from it
+    through containers, instance dicts and slots, counting each object once.
+    Instances of `exclude` (and classes, modules, functions and enum members)
+    are neither counted nor followed. Pass the same `seen` set to several
+    calls to not count shared objects twice.
+    """
+    if seen is None:
+        seen = set()
+    skip = (type, ModuleType, FunctionType, Enum) + exclude
+    total = 0
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, skip):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, memoryview, int, float)) or obj is None:
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        attrs = getattr(obj, "__dict__", None)
+        if attrs is not None:
+            stack.append(attrs)
+        for cls in type(obj).__mro__:
+            for name in cls.__dict__.get("__slots__", ()):
+                if name in ("__dict__", "__weakref__"):
+                    continue
+                try:
+                    stack.append(object.__getattribute__(obj, name))
+                except AttributeError:
+                    pass
+    return total
+
+
 class Serialisable(ABC):
     """
     Base class for all serialisable objects.
     """
 
+    # The hxbit type-system classes are slotted: a parsed file keeps thousands
+    # of them alive. Subclasses that don't declare __slots__ still get a __dict__.
+    __slots__ = ("value",)
+
     value: Any
 
     @abstractmethod
@@ -65,7 +469,7 @@ class Serialisable(ABC):
 
     @abstractmethod
     def deserialise(
-        self, f: BinaryIO | BytesIO, *args: Any, **kwargs: Any
+        self, f: Readable, *args: Any, **kwargs: Any
     ) -> "Serialisable":
         pass
 
@@ -113,7 +517,7 @@ class RawData(Serialisable):
         self.value = b""
         self.length = length
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "RawData":
+    def deserialise(self, f: Readable) -> "RawData":
         self.value = f.read(self.length)
         return self
 
@@ -139,7 +543,7 @@ class SerialisableInt(Serialisable):
 
     def deserialise(
         self,
-        f: BinaryIO | BytesIO,
+        f: Readable,
         length: int = 4,
         byteorder: Literal["little", "big"] = "little",
         signed: bool = False,
@@ -168,7 +572,7 @@ class SerialisableF64(Serialisable):
     def __init__(self) -> None:
         self.value = 0.0
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "SerialisableF64":
+    def deserialise(self, f: Readable) -> "SerialisableF64":
         self.value = struct.unpack("<d", f.read(8))[0]
         return self
 
@@ -181,12 +585,18 @@ class VarInt(Serialisable):
     Represents a variable-length integer using the hxbit serialization format.
     """
 
+    __slots__ = ()
+
     value: int
 
     def __init__(self, value: int = 0):
         self.value = value
 
-    def deserialise(self: T, f: BinaryIO | BytesIO) -> T:
+    def deserialise(self: T, f: Readable) -> T:
+        if isinstance(f, ByteReader):
+            self.value = f.read_varint()
+            return self
+
         tag_byte = f.read(1)
         if not tag_byte:
             raise EOFError("Unexpected end of stream while reading VarInt tag.")
@@ -229,6 +639,8 @@ class Resolvable(ABC):
     Base class for resolvable references.
     """
 
+    __slots__ = ()
+
     @abstractmethod
     def resolve_schema(self, context: "HXSFile") -> Any:
         """
@@ -242,18 +654,26 @@ class ResolvableVarInt(VarInt, Resolvable, ABC):
     Base class for resolvable VarInts. Call `resolve` to get a direct reference to the object it points to.
     """
 
+    __slots__ = ()
+
 
 class String(Serialisable):
     """
     Represents a string using the hxbit serialization format.
     """
 
+    __slots__ = ()
+
     value: str | None
 
     def __init__(self, value: str | None = None):
         self.value = value
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "String":
+    def deserialise(self, f: Readable) -> "String":
+        if isinstance(f, ByteReader):
+            self.value = f.read_string()
+            return self
+
         length_prefix_varint = VarInt().deserialise(f)
         length_plus_one = length_prefix_varint.value
 
@@ -305,6 +725,8 @@ class String(Serialisable):
 class ClassDef(Serialisable):
     """Represents a single class definition in the HXS header."""
 
+    __slots__ = ("name", "clid", "crc32")
+
     name: String
     clid: "CLID"
     crc32: SerialisableInt
@@ -315,7 +737,7 @@ class ClassDef(Serialisable):
         self.crc32 = SerialisableInt()
         self.crc32.length = 4
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "ClassDef":
+    def deserialise(self, f: Readable) -> "ClassDef":
         self.clid.deserialise(f)
         self.crc32.deserialise(f, length=4, byteorder="little", signed=False)
         return self
@@ -335,6 +757,8 @@ class UID(ResolvableVarInt):
     Represents a unique identifier (UID) to a specific class type in the data.
     """
 
+    __slots__ = ("_resolved",)
+
     _resolved: "Schema | None"
 
     def __init__(self, value: int = 0):
@@ -377,6 +801,8 @@ class CLID(Resolvable):
     Represents a fixed 2-byte unsigned integer in big-endian order.
     """
 
+    __slots__ = ("value", "_resolved")
+
     value: int
     _resolved: ClassDef | None
 
@@ -386,7 +812,11 @@ class CLID(Resolvable):
         self.value = value
         self._resolved = None
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "CLID":
+    def deserialise(self, f: Readable) -> "CLID":
+        if isinstance(f, ByteReader):
+            self.value = f.read_u16_be()
+            return self
+
         data = f.read(2)
         if len(data) < 2:
             raise EOFError("Unexpected end of stream while reading CLID.")
@@ -432,6 +862,8 @@ class VarCLID(ResolvableVarInt):
     Represents a variable-length CLID that can be resolved to a specific ClassDef.
     """
 
+    __slots__ = ("_resolved",)
+
     _resolved: ClassDef | None
 
     def __init__(self, value: int = 0):
@@ -460,12 +892,18 @@ class Boolean(Serialisable):
     Represents a boolean value in the hxbit serialization format.
     """
 
+    __slots__ = ()
+
     value: bool
 
     def __init__(self, value: bool = False):
         self.value = value
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "Boolean":
+    def deserialise(self, f: Readable) -> "Boolean":
+        if isinstance(f, ByteReader):
+            self.value = f.read_byte() != 0
+            return self
+
         byte = f.read(1)
         if not byte:
             raise EOFError("Unexpected end of stream while reading Boolean.")
@@ -505,6 +943,8 @@ class PropTypeDesc(Serialisable):
         PNoSave = 21
         PStruct = 22
 
+    __slots__ = ("kind",)
+
     value: int
     kind: Kind
 
@@ -513,7 +953,7 @@ class PropTypeDesc(Serialisable):
         self.value = value
         self.kind = PropTypeDesc.Kind(value)
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "PropTypeDesc":
+    def deserialise(self, f: Readable) -> "PropTypeDesc":
         byte = f.read(1)
         if not byte:
             raise EOFError("Unexpected end of stream while reading PropTypeDesc kind.")
@@ -537,16 +977,20 @@ class PropTypeDesc(Serialisable):
 
 
 class PropTypeDef(Serialisable, ABC):
+    __slots__ = ()
+
     @abstractmethod
     def __repr__(self) -> str:
         pass
 
 
 class Empty(PropTypeDef):
+    __slots__ = ()
+
     def __init__(self) -> None:
         pass
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "Empty":
+    def deserialise(self, f: Readable) -> "Empty":
         return self
 
     def serialise(self) -> bytes:
@@ -557,12 +1001,14 @@ class Empty(PropTypeDef):
 
 
 class NameDef(PropTypeDef):
+    __slots__ = ("name",)
+
     name: String
 
     def __init__(self) -> None:
         self.name = String()
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "NameDef":
+    def deserialise(self, f: Readable) -> "NameDef":
         self.name.deserialise(f)
         return self
 
@@ -574,6 +1020,8 @@ class NameDef(PropTypeDef):
 
 
 class MapDef(PropTypeDef):
+    __slots__ = ("key_type", "value_type")
+
     key_type: "PropType"
     value_type: "PropType"
 
@@ -581,7 +1029,7 @@ class MapDef(PropTypeDef):
         self.key_type = PropType()
         self.value_type = PropType()
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "MapDef":
+    def deserialise(self, f: Readable) -> "MapDef":
         self.key_type.deserialise(f)
         self.value_type.deserialise(f)
         return self
@@ -594,12 +1042,14 @@ class MapDef(PropTypeDef):
 
 
 class TypeDef(PropTypeDef):
+    __slots__ = ("type",)
+
     type: "PropType"
 
     def __init__(self) -> None:
         self.type = PropType()
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "TypeDef":
+    def deserialise(self, f: Readable) -> "TypeDef":
         self.type.deserialise(f)
         return self
 
@@ -614,6 +1064,8 @@ class TypeDef(PropTypeDef):
 
 
 class ObjFieldDef(Serialisable):
+    __slots__ = ("name", "type", "opt")
+
     name: String | None
     type: "PropType | None"
     opt: Boolean
@@ -623,7 +1075,7 @@ class ObjFieldDef(Serialisable):
         self.type = None
         self.opt = Boolean()
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "ObjFieldDef":
+    def deserialise(self, f: Readable) -> "ObjFieldDef":
         fbits = VarInt().deserialise(f)
 
         if fbits.value == 0:
@@ -664,12 +1116,15 @@ class ObjFieldDef(Serialisable):
 
 
 class ObjDef(PropTypeDef):
+    __slots__ = ("fields", "_layout")
+
     fields: List[ObjFieldDef]
 
     def __init__(self) -> None:
         self.fields = []
+        self._layout: ObjLayout | None = None  # see HXSFile._obj_layout
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "ObjDef":
+    def deserialise(self, f: Readable) -> "ObjDef":
         nfields_plus_1 = VarInt().deserialise(f)
         if nfields_plus_1.value > 1:
             num_fields = nfields_plus_1.value - 1
@@ -692,6 +1147,18 @@ class ObjDef(PropTypeDef):
         return f"ObjDef(fields={self.fields})"
 
 
+class ObjLayout(NamedTuple):
+    """
+    How the anonymous objects of an ObjDef are laid out on the wire. Worked
+    out once per ObjDef (see HXSFile._obj_layout) instead of for every value.
+    """
+
+    names: Tuple[str, ...]
+    bits: Tuple[int | None, ...]  # presence bit of each field, None if always written
+    types: Tuple["PropType | None", ...]  # None for the untyped string hack
+    nullable: int  # how many fields have a presence bit
+
+
 class OldStruct(PropTypeDef):
     name: String
     fields: List[Dict[str, Union[String, "PropType"]]]
@@ -700,7 +1167,7 @@ class OldStruct(PropTypeDef):
         self.name = String()
         self.fields = []
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "OldStruct":
+    def deserialise(self, f: Readable) -> "OldStruct":
         self.name.deserialise(f)
         nfields = VarInt().deserialise(f).value
         tell(f"Struct '{self.name.value}' has {nfields} fields.")
@@ -753,14 +1220,52 @@ class PropType(Serialisable):
         PropTypeDesc.Kind.PStruct: NameDef,
     }
 
+    __slots__ = ("kind", "defn", "_compiled", "_frozen")
+
     kind: PropTypeDesc | None
     defn: PropTypeDef | None
+    _compiled: Dict[str, Any]
 
     def __init__(self) -> None:
         self.kind = None
         self.defn = None
+        self._compiled = {}
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"Cannot set {name!r} on an interned (immutable) PropType.")
+        object.__setattr__(self, name, value)
+
+    def freeze(self) -> "PropType":
+        """
+        Makes this type, and every type nested in it, immutable, so it can be
+        shared between fields (see HXSFile._intern_field_types). Decoder
+        caches in `_compiled` stay writable.
+        """
+        defn = self.defn
+        if isinstance(defn, TypeDef):
+            defn.type.freeze()
+        elif isinstance(defn, MapDef):
+            defn.key_type.freeze()
+            defn.value_type.freeze()
+        elif isinstance(defn, ObjDef):
+            for field in defn.fields:
+                if field.type is not None:
+                    field.type.freeze()
+        object.__setattr__(self, "_frozen", True)
+        return self
+
+    # Compiled decoders are closures and can't be pickled (see
+    # DiskSchemaTableCache); they are rebuilt on first use instead.
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "defn": self.defn, "_frozen": getattr(self, "_frozen", False)}
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "PropType":
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_compiled", {})
+
+    def deserialise(self, f: Readable) -> "PropType":
         kind_byte_val = f.read(1)
         if not kind_byte_val:
             raise EOFError("Unexpected EOF while reading PropType kind byte.")
@@ -847,11 +1352,14 @@ class PropType(Serialisable):
 
 
 class Schema(Serialisable):
+    __slots__ = ("uid", "clid", "field_names", "field_types", "classdef", "_compiled")
+
     uid: UID
     clid: VarInt
     field_names: List[String]
     field_types: List[PropType]
     classdef: ClassDef | None
+    _compiled: Dict[str, Any]
 
     def __init__(self) -> None:
         self.uid = UID()
@@ -859,8 +1367,20 @@ class Schema(Serialisable):
         self.field_names = []
         self.field_types = []
         self.classdef = None
+        self._compiled = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {
+            name: getattr(self, name)
+            for name in ("uid", "clid", "field_names", "field_types", "classdef")
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._compiled = {}
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "Schema":
+    def deserialise(self, f: Readable) -> "Schema":
         self.uid.deserialise(f)
         self.clid.deserialise(f)
 
@@ -928,34 +1448,89 @@ class Schema(Serialisable):
         return "\n".join(lines)
 
 
+class FieldDict(dict):
+    """
+    An Obj's fields. Setting, deleting or replacing a field marks the owning
+    object dirty; edits made inside a nested list or dict can't be seen, so
+    call `Obj.mark_dirty()` after those.
+    """
+
+    __slots__ = ("owner",)
+
+    def __init__(self, owner: "Obj", *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.owner = owner
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        super().__setitem__(key, value)
+        self.owner.mark_dirty()
+
+    def __delitem__(self, key: str) -> None:
+        super().__delitem__(key)
+        self.owner.mark_dirty()
+
+    def __ior__(self, other: Any) -> "FieldDict":  # type: ignore[override]
+        self.update(other)
+        return self
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        super().update(*args, **kwargs)
+        self.owner.mark_dirty()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self.owner.mark_dirty()
+        return super().setdefault(key, default)
+
+    def pop(self, *args: Any) -> Any:
+        self.owner.mark_dirty()
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[str, Any]:
+        self.owner.mark_dirty()
+        return super().popitem()
+
+    def clear(self) -> None:
+        super().clear()
+        self.owner.mark_dirty()
+
+
 class Obj:
     """
     Represents an object in the HXS file.
     It holds a reference to its schema and the HXSFile context for deserialization.
     """
 
+    __slots__ = ("schema", "context", "_fields", "uid", "dirty", "__weakref__")
+
     def __init__(self, schema: "Schema", context: "HXSFile") -> None:
         self.schema = schema
         self.context = context
-        self.fields: Dict[str, Any] = {}
+        self._fields = FieldDict(self)
+        self.uid: int | None = None  # UID it was read with, reused when writing
+        self.dirty = False  # edited since it was read
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        return self._fields
+
+    @fields.setter
+    def fields(self, value: Dict[str, Any]) -> None:
+        self._fields = FieldDict(self, value)
+        self.mark_dirty()
+
+    def mark_dirty(self) -> None:
+        """Flags the object as edited, so serialise() re-encodes it instead of copying its original bytes."""
+        if not self.dirty:
+            self.dirty = True
+            self.context.dirty_objects.add(self)
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "Obj":
+    def deserialise(self, f: ByteReader) -> "Obj":
         """Populates the object's fields by reading from the stream according to its schema."""
         if not self.schema:
             return self
 
-        tell(
-            f"Class {self.schema.classdef.name.value if self.schema.classdef else 'Unknown'}"
-        )
-        for i, field_name in enumerate(self.schema.field_names):
-            field_type = self.schema.field_types[i]
-            assert field_name.value is not None
-            self.context._push_read_context(field_name.value)
-            try:
-                val = self.context._read_value(f, field_type)
-                self.fields[field_name.value] = val
-            finally:
-                self.context._pop_read_context()
+        walk(self.context._schema_steps_for(self.schema)(self.context, f, self._fields))
         return self
     
     def serialise(self) -> None:
@@ -963,10 +1538,7 @@ class Obj:
         if not self.schema:
             return
 
-        for field_name, field_type in zip(self.schema.field_names, self.schema.field_types):
-            assert field_name.value is not None
-            value = self.fields.get(field_name.value)
-            self.context._write_value(field_type, value)
+        walk(self.context._fields_write_steps(self))
 
     def __repr__(self) -> str:
         # Deliberately shallow: the object graph is densely cross-linked, so
@@ -980,181 +1552,959 @@ class Obj:
         return f"<Obj class='{class_name}' ({len(self.fields)} fields)>"
     
     def _format_value(self, value: Any, indent: int, seen: Set[Any]) -> str:
-        """Helper function to recursively format values for pretty-printing."""
-        
+        """Helper function to format values for pretty-printing."""
+        return "".join(stream(self._format_chunks(value, indent, seen)))
+
+    @staticmethod
+    def _format_scalar(value: Any) -> str:
+        return repr(value) if isinstance(value, str) else str(value)
+
+    def _format_chunks(self, value: Any, indent: int, seen: Set[Any]) -> "Steps":
+        """
+        Step generator (see stream) yielding the text of `value` in chunks.
+        Nested objects, lists and dicts are yielded as step generators of
+        their own, so no depth of nesting recurses.
+        """
         if isinstance(value, Obj):
-            return value.pprint(indent, seen)
+            yield value._pprint_chunks(indent, seen)
+            return
 
         if isinstance(value, list):
-            if not value: return "[]"
+            if not value:
+                yield "[]"
+                return
             inner_indent_str = "  " * (indent + 1)
-            items = [f"\n{inner_indent_str}{self._format_value(item, indent + 1, seen)}" for item in value]
-            outer_indent_str = "  " * indent
-            return f"[{','.join(items)}\n{outer_indent_str}]"
+            yield "["
+            for i, item in enumerate(value):
+                sep = "," if i else ""
+                if isinstance(item, (Obj, list, dict)):
+                    yield f"{sep}\n{inner_indent_str}"
+                    yield self._format_chunks(item, indent + 1, seen)
+                else:
+                    yield f"{sep}\n{inner_indent_str}{self._format_scalar(item)}"
+            yield f"\n{'  ' * indent}]"
+            return
 
         if isinstance(value, dict):
-            if not value: return "{}"
+            if not value:
+                yield "{}"
+                return
             inner_indent_str = "  " * (indent + 1)
-            items = [f"\n{inner_indent_str}{repr(k)}: {self._format_value(v, indent + 1, seen)}" for k, v in value.items()]
-            outer_indent_str = "  " * indent
-            return f"{{{','.join(items)}\n{outer_indent_str}}}"
-        
-        if isinstance(value, str):
-            return repr(value)
-        
-        return str(value)
+            yield "{"
+            for i, (k, v) in enumerate(value.items()):
+                sep = "," if i else ""
+                if isinstance(v, (Obj, list, dict)):
+                    yield f"{sep}\n{inner_indent_str}{repr(k)}: "
+                    yield self._format_chunks(v, indent + 1, seen)
+                else:
+                    yield f"{sep}\n{inner_indent_str}{repr(k)}: {self._format_scalar(v)}"
+            yield f"\n{'  ' * indent}}}"
+            return
+
+        yield self._format_scalar(value)
 
     def pprint(self, indent: int = 0, seen: Set[Any] | None = None) -> str:
         """
         Returns a human-readable, indented string representation of the object,
-        with cycle detection to prevent infinite recursion.
+        with cycle detection to prevent infinite recursion. See iter_pprint()
+        and pprint_to() to produce it incrementally.
         """
-        obj_id = id(self)
+        return "".join(self.iter_pprint(indent, seen))
 
+    def iter_pprint(self, indent: int = 0, seen: Set[Any] | None = None) -> Iterator[str]:
+        """
+        Yields the text of pprint() in chunks as it is produced. Nesting is
+        walked on an explicit stack, and nothing past the last chunk taken is
+        formatted (or, for lazy objects, decoded).
+        """
         if seen is None:
             seen = set()
+        return stream(self._pprint_chunks(indent, seen))
+
+    def pprint_to(self, stream: TextIO, max_chars: int | None = None) -> bool:
+        """
+        Writes pprint() to `stream`, stopping after `max_chars` characters if
+        given, so dumping a huge object graph costs no more than the budget.
+        Returns whether the output was cut short.
+        """
+        remaining = max_chars
+        for chunk in self.iter_pprint():
+            if remaining is not None:
+                if len(chunk) > remaining:
+                    stream.write(chunk[:remaining])
+                    return True
+                remaining -= len(chunk)
+            stream.write(chunk)
+        return False
+
+    def _pprint_chunks(self, indent: int, seen: Set[Any]) -> "Steps":
+        obj_id = id(self)
+        class_name = self.schema.classdef.name.value if self.schema and self.schema.classdef else "Unknown"
 
         if obj_id in seen:
-            class_name = self.schema.classdef.name.value if self.schema and self.schema.classdef else "Unknown"
-            return f"<Circular Reference to Obj class='{class_name}' id={obj_id}>"
+            yield f"<Circular Reference to Obj class='{class_name}' id={obj_id}>"
+            return
 
         seen.add(obj_id)
 
-        class_name = self.schema.classdef.name.value if self.schema and self.schema.classdef else "Unknown"
         outer_indent_str = "  " * indent
         header = f"{outer_indent_str}<Obj class='{class_name}'>"
 
         if not self.fields:
-            return f"{header} {{}}"
+            yield f"{header} {{}}"
+            return
 
-        lines = [f"{header} {{"]
+        yield f"{header} {{"
         inner_indent_str = "  " * (indent + 1)
         
         field_items = list(self.fields.items())
         for i, (key, value) in enumerate(field_items):
-            formatted_value = self._format_value(value, indent + 1, seen)
             line_end = "," if i < len(field_items) - 1 else ""
-            lines.append(f"{inner_indent_str}{key}: {formatted_value}{line_end}")
+            if isinstance(value, (Obj, list, dict)):
+                yield f"\n{inner_indent_str}{key}: "
+                yield self._format_chunks(value, indent + 1, seen)
+                yield line_end
+            else:
+                yield f"\n{inner_indent_str}{key}: {self._format_scalar(value)}{line_end}"
 
-        lines.append(f"{outer_indent_str}}}")
-        return "\n".join(lines)
+        yield f"\n{outer_indent_str}}}"
 
 
-class HXSFile(Serialisable):
-    magic: String
-    version: SerialisableInt
-    classdefs: List[ClassDef]
-    schema_size: VarInt
-    schemas: List[Schema]
-    objects: Dict[int, Obj]  # uid, obj
+class LazyObj(Obj):
+    """
+    An Obj read in lazy mode (see HXSFile.from_bytes). The first pass only
+    records where the object is defined in the payload; `fields` is decoded
+    from those bytes the first time it is accessed.
+    """
 
-    def __init__(self, shims: Optional[str]=None) -> None:
-        self.magic = String("HXS")
-        self.version = SerialisableInt()
-        self.version.value = 1
-        self.version.length = 1
-        self.classdefs = []
-        self.schema_size = VarInt()
-        self.schemas = []
-        self.objects = {} # Read cache
-        self.obj: Obj | None = None
-        self.roots: List["Obj"] = []
-        self.raw_object_data: bytes | None = None
-        self.object_parse_error: Exception | None = None
-        self.unresolved_clids: List[Dict[str, Any]] = []
-        self.shims = shims
-        self.enum_shims: Dict[str, Any] = {}
-        self._read_context: List[str] = []
+    __slots__ = ("def_pos", "start", "end")
 
-        # Serialization state
-        self.buffer = BytesIO()
-        self.written_objects: Dict[int, int] = {} # Python object id -> written UID
-        self.next_uid = 1
+    def __init__(self, schema: "Schema", context: "HXSFile", uid: int, def_pos: int) -> None:
+        self.schema = schema
+        self.context = context
+        self.uid = uid
+        self.dirty = False
+        self._fields: FieldDict | None = None  # type: ignore[assignment]
+        # Offset of the defining reference's UID, and the span of the field data.
+        self.def_pos = def_pos
+        self.start = def_pos
+        self.end = def_pos
 
-    def deserialise(self, f: BinaryIO | BytesIO) -> "HXSFile":
-        self.magic.deserialise(f)
-        assert self.magic.value == "HXS"
-        self.version.deserialise(f, length=1)
-        assert self.version.value == 1
-        while True:
-            name = String().deserialise(f)
-            if name.value is None:
-                break
-            cdef = ClassDef()
-            cdef.name = name
-            cdef.deserialise(f)
-            self.classdefs.append(cdef)
-        self.schema_size.deserialise(f)
-        if self.schema_size.value > 0:
-            schemas_start_pos = f.tell()
-            schemas_end_pos = schemas_start_pos + self.schema_size.value
-            while f.tell() < schemas_end_pos:
-                self.schemas.append(Schema().deserialise(f))
+    @property
+    def fields(self) -> Dict[str, Any]:  # type: ignore[override]
+        if self._fields is None:
+            self._fields = FieldDict(self)
+            self.context._load_lazy(self)
+        return self._fields
 
-        self._link_and_resolve_references()
-        if self.shims is not None:
-            self._apply_type_shims(shims.shims_for(self.shims))
-            self.enum_shims = shims.enums_for(self.shims)
-        self.raw_object_data = f.read()
-        try:
-            self.obj = self._read_root_object(BytesIO(self.raw_object_data))
-        except Exception as e:
-            self.object_parse_error = e
-            self.objects = {}
-            self.obj = None
+    @fields.setter
+    def fields(self, value: Dict[str, Any]) -> None:
+        self._fields = FieldDict(self, value)
+        self.mark_dirty()
 
-        return self
+    @property
+    def loaded(self) -> bool:
+        return self._fields is not None
 
-    def _push_read_context(self, segment: str) -> None:
-        self._read_context.append(segment)
+    def __repr__(self) -> str:
+        if self._fields is None:
+            class_name = self.schema.classdef.name.value if self.schema.classdef else "Unknown"
+            return f"<Obj class='{class_name}' (not loaded)>"
+        return super().__repr__()
 
-    def _pop_read_context(self) -> None:
-        if self._read_context:
-            self._read_context.pop()
 
-    def _current_read_path(self) -> str:
-        if not self._read_context:
-            return "<root>"
-        return ".".join(self._read_context)
+class ObjectSpan(NamedTuple):
+    """Where an object is defined in an HXS object payload."""
 
-    def _peek_stream_bytes(self, f: BinaryIO | BytesIO, radius: int = 16) -> str | None:
-        if not isinstance(f, BytesIO):
-            return None
-        pos = f.tell()
-        data = f.getbuffer()
-        start = max(0, pos - radius)
-        end = min(len(data), pos + radius)
-        return bytes(data[start:end]).hex(" ")
+    uid: int
+    schema: "Schema"
+    start: int  # offset of the defining reference's UID
+    data_start: int  # offset of the object's first field
+    end: int
 
-    def _record_unresolved_clid(
-        self,
-        clid: int,
-        declared_schema: "Schema | None",
-        f: BinaryIO | BytesIO,
-    ) -> None:
-        declared_name = None
-        if declared_schema is not None and declared_schema.classdef is not None:
-            declared_name = declared_schema.classdef.name.value
-        self.unresolved_clids.append(
-            {
-                "clid": clid,
-                "path": self._current_read_path(),
-                "declared_schema": declared_name,
-                "offset": f.tell(),
-                "nearby_bytes": self._peek_stream_bytes(f),
-            }
-        )
 
-    def pprint_unresolved_clids(self) -> str:
-        if not self.unresolved_clids:
+class ObjectIndex:
+    """
+    Byte-span index of the objects defined in an HXS object payload, in
+    definition (i.e. stream) order. Spans nest: an object's span contains
+    the definitions of every object it defines inline.
+    """
+
+    def __init__(self) -> None:
+        self.starts: List[int] = []
+        self.data_starts: List[int] = []
+        self.ends: List[int] = []
+        self.objects: List[Obj] = []
+        self.parents: List[int] = []  # entry index of the enclosing object, or -1
+        # UIDs of earlier-defined objects each entry's own fields refer back to.
+        self.backrefs: Dict[int, List[int]] = {}
+        self._by_uid: Dict[int, int] = {}
+        self._open: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def begin(self, obj: Obj, start: int, data_start: int) -> int:
+        """Records the start of an object's definition; returns its entry index."""
+        entry = len(self.objects)
+        self.starts.append(start)
+        self.data_starts.append(data_start)
+        self.ends.append(data_start)
+        self.objects.append(obj)
+        self.parents.append(self._open[-1] if self._open else -1)
+        if obj.uid is not None:
+            self._by_uid[obj.uid] = entry
+        self._open.append(entry)
+        return entry
+
+    def finish(self, entry: int, end: int) -> None:
+        self.ends[entry] = end
+        self._open.pop()
+
+    def add_backref(self, uid: int) -> None:
+        """Records that the object being read refers to the already-read object `uid`."""
+        if self._open:
+            self.backrefs.setdefault(self._open[-1], []).append(uid)
+
+    def truncate(self, length: int) -> None:
+        """Drops every entry from `length` on (e.g. after a failed parse attempt)."""
+        for obj in self.objects[length:]:
+            self._by_uid.pop(obj.uid, None)  # type: ignore[arg-type]
+        for column in (self.starts, self.data_starts, self.ends, self.objects, self.parents):
+            del column[length:]
+        for entry in [e for e in self.backrefs if e >= length]:
+            del self.backrefs[entry]
+        self._open = []
+
+    def innermost(self) -> Obj | None:
+        """The object whose definition is currently being read, if any."""
+        return self.objects[self._open[-1]] if self._open else None
+
+    def entry_of(self, obj: Obj) -> int:
+        entry = self._by_uid.get(obj.uid) if obj.uid is not None else None  # type: ignore[arg-type]
+        if entry is None or self.objects[entry] is not obj:
+            raise KeyError(f"{obj!r} is not in the index.")
+        return entry
+
+    def subtree(self, entry: int) -> range:
+        """Entry indices of the object at `entry` and everything defined inside it."""
+        return range(entry, bisect_left(self.starts, self.ends[entry], entry))
+
+    def span(self, entry: int) -> ObjectSpan:
+        obj = self.objects[entry]
+        return ObjectSpan(
+            obj.uid, obj.schema, self.starts[entry], self.data_starts[entry], self.ends[entry]  # type: ignore[arg-type]
+        )
+
+    def span_of(self, uid: int) -> ObjectSpan:
+        """Returns where the object with `uid` is defined."""
+        entry = self._by_uid.get(uid)
+        if entry is None:
+            raise KeyError(f"No object with UID {uid} in the index.")
+        return self.span(entry)
+
+    def object_at(self, offset: int) -> Obj | None:
+        """Returns the innermost object whose definition covers `offset`."""
+        entry = bisect_right(self.starts, offset) - 1
+        while entry >= 0 and self.ends[entry] <= offset:
+            entry = self.parents[entry]
+        return self.objects[entry] if entry >= 0 else None
+
+
+class ObjectRef(NamedTuple):
+    """
+    Stands in for an object read by HXSFile.visit, in its object table and
+    wherever a field refers to it.
+    """
+
+    uid: int
+    schema: "Schema"
+
+    @property
+    def class_name(self) -> str | None:
+        return self.schema.classdef.name.value if self.schema.classdef else None
+
+
+class DynamicEnum(NamedTuple):
+    """
+    An enum value in PDynamic data, where hxbit stores only the enum's name
+    and constructor index (no arguments).
+    """
+
+    name: str | None
+    constructor: int
+
+
+class ObjectVisitor:
+    """
+    Receives the objects of an HXS payload as HXSFile.visit reads them,
+    without the file keeping them. Subclass it and override what you need.
+
+    Objects are reported in definition order. An object defined inline in
+    another's field is reported in full between the outer object's
+    on_object_start and its fields, which all come after their values are
+    read. References to objects are passed as ObjectRef.
+    """
+
+    def on_object_start(self, uid: int, schema: "Schema") -> None:
+        pass
+
+    def on_field(self, name: str, value: Any) -> None:
+        pass
+
+    def on_object_end(self, uid: int) -> None:
+        pass
+
+
+# How much read-path tracking HXSFile does:
+#   "off"            - none; errors don't say where in the object graph they happened.
+#   "paths-on-error" - none while reading; if the parse fails, the payload is
+#                      read again with tracking on to find the failing path.
+#   "full"           - every read tracks its path (and prints a field-level
+#                      trace when the DEBUG environment variable is set).
+Diagnostics = Literal["off", "paths-on-error", "full"]
+
+# What arrays of PInt, PFloat and PBool decode to: Python lists, array.array
+# ("i", "f" and "B" typecodes) or NumPy arrays (int32, float32, bool). All
+# three are decoded in bulk and written back from any of the three.
+PrimitiveArrays = Literal["list", "array", "numpy"]
+
+
+RootHintKey = Tuple[int, int]  # (CRC32 of the classdef name list, root index)
+
+
+class RootSchemaHints:
+    """
+    Remembers which schema parsed each root object of a file, so the next
+    file with the same class definitions can try that schema first instead
+    of every schema in turn. Hints are keyed by (classdef name list CRC, root
+    index) and store the winning schema's class name.
+
+    Hints are opt-in: pass an instance as `root_hints` to the files that
+    should share them. A hinted schema that parses to the end of the buffer
+    is taken without trying the others, so for payloads that more than one
+    class can parse, hints can change which class is read, and the result
+    depends on what was parsed before with the same hints. Subclass it and
+    override `get` and `put` to keep hints elsewhere.
+    """
+
+    def __init__(self) -> None:
+        self._hints: Dict[RootHintKey, str] = {}
+
+    def get(self, key: RootHintKey) -> str | None:
+        return self._hints.get(key)
+
+    def put(self, key: RootHintKey, class_name: str) -> None:
+        self._hints[key] = class_name
+
+
+class JSONRootSchemaHints(RootSchemaHints):
+    """
+    Root schema hints persisted to a JSON file, which is rewritten whenever
+    a new or changed hint is recorded.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        for key, class_name in stored.items():
+            crc, _, index = key.partition(":")
+            try:
+                self._hints[(int(crc, 16), int(index))] = class_name
+            except ValueError:
+                continue
+
+    def put(self, key: RootHintKey, class_name: str) -> None:
+        if self._hints.get(key) == class_name:
+            return
+        super().put(key, class_name)
+        stored = {f"{crc:08x}:{index}": name for (crc, index), name in self._hints.items()}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Hints are an optimisation; failing to persist them is not an error.
+
+
+class SchemaTables(NamedTuple):
+    """
+    A file's class definitions and schemas, already linked, shim-patched and
+    interned. Shared between every file with the same schema header, so
+    treat it as read-only.
+    """
+
+    classdefs: List["ClassDef"]
+    schemas: List["Schema"]
+    enum_shims: Dict[str, Any]
+    class_index_by_name: Dict[str, int]
+    class_index_by_clid: Dict[int, int]
+
+
+SchemaCacheKey = Tuple[str | None, bytes]  # (shims name, digest of the schema header bytes)
+
+
+class SchemaTableCache:
+    """
+    LRU cache of SchemaTables, keyed by the shims in use and a digest of the
+    classdef + schema byte range. Saves from the same game build carry
+    identical headers, so only the first file of each build pays for parsing,
+    linking and shimming its schemas.
+
+    Caching is opt-in: pass an instance as `schema_cache` to the files that
+    should share tables. Those files then share the same ClassDef and Schema
+    objects, so none of them may edit its schemas. Subclass it and override
+    `get` and `put` to keep tables elsewhere.
+    """
+
+    def __init__(self, maxsize: int = 16) -> None:
+        self.maxsize = maxsize
+        self._tables: "OrderedDict[SchemaCacheKey, SchemaTables]" = OrderedDict()
+
+    def get(self, key: SchemaCacheKey) -> SchemaTables | None:
+        tables = self._tables.get(key)
+        if tables is not None:
+            self._tables.move_to_end(key)
+        return tables
+
+    def put(self, key: SchemaCacheKey, tables: SchemaTables) -> None:
+        if self.maxsize <= 0:
+            return
+        self._tables[key] = tables
+        self._tables.move_to_end(key)
+        while len(self._tables) > self.maxsize:
+            self._tables.popitem(last=False)
+
+    def clear(self) -> None:
+        self._tables.clear()
+
+
+def _default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "alivecells", "hxbit-schemas")
+
+
+_cache_format: str | None = None
+
+
+def _schema_cache_format() -> str:
+    """
+    Identifies the pickle layout of SchemaTables: a hash of this module's
+    source, so tables written by a different hxbit version are never loaded.
+    """
+    global _cache_format
+    if _cache_format is None:
+        try:
+            with open(__file__, "rb") as f:
+                _cache_format = f"{zlib.crc32(f.read()):08x}"
+        except OSError:
+            _cache_format = "unversioned"
+    return _cache_format
+
+
+@lru_cache(maxsize=None)
+def _shims_version(shims_name: str | None) -> str | None:
+    """
+    Identifies a shim library by name and contents (its type and enum
+    shims), so tables patched with an edited library are never loaded.
+    None if the library can't be loaded.
+    """
+    if shims_name is None:
+        return "noshims"
+    try:
+        contents = json.dumps(
+            [shims.shims_for(shims_name), shims.enums_for(shims_name)], sort_keys=True, default=repr
+        )
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return f"{shims_name}.{zlib.crc32(contents.encode('utf-8')):08x}"
+
+
+class DiskSchemaTableCache(SchemaTableCache):
+    """
+    A SchemaTableCache that also pickles tables to `directory` (by default
+    ~/.cache/alivecells/hxbit-schemas), so new processes start warm. Files
+    are keyed by shim library (name and contents), schema header digest and
+    hxbit version; once they total more than `max_bytes`, the least recently
+    used are deleted.
+
+    Compiled decoders can't be pickled and are rebuilt on first use. Only
+    point this at a directory you trust: loading a pickle can run code.
+    """
+
+    def __init__(self, directory: str | None = None, maxsize: int = 16, max_bytes: int = 64 << 20) -> None:
+        super().__init__(maxsize)
+        self.directory = directory or _default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _path(self, key: SchemaCacheKey) -> str | None:
+        """The file for `key`, or None to keep its tables in memory only."""
+        shims_name, digest = key
+        shims_version = _shims_version(shims_name)
+        if shims_version is None:
+            return None
+        return os.path.join(
+            self.directory, f"{shims_version}-{digest.hex()}-{_schema_cache_format()}.pickle"
+        )
+
+    def get(self, key: SchemaCacheKey) -> SchemaTables | None:
+        tables = super().get(key)
+        if tables is not None:
+            return tables
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                tables = pickle.load(f)
+            os.utime(path)  # mark as recently used
+        except OSError:
+            return None
+        except Exception:
+            try:
+                os.remove(path)  # unreadable or stale; drop it
+            except OSError:
+                pass
+            return None
+        if not isinstance(tables, SchemaTables):
+            return None
+        super().put(key, tables)
+        return tables
+
+    def put(self, key: SchemaCacheKey, tables: SchemaTables) -> None:
+        super().put(key, tables)
+        path = self._path(key)
+        if path is None:
+            return
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            self._evict()
+        except (OSError, pickle.PicklingError, RecursionError):
+            # The disk cache is an optimisation; failing to persist is not an error.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".pickle") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        super().clear()
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".pickle"):
+                        os.remove(entry.path)
+        except OSError:
+            pass
+
+
+# Root schema trials in worker processes (see HXSFile.root_workers). Each
+# worker keeps one trial file sharing the parent's schema tables, and reports
+# only whether an attempt succeeded and where it stopped; the parent then
+# parses the winner itself. The UIDs defined by earlier roots are kept in the
+# trial's object table between attempts, so each task only carries new ones.
+_root_trial: "Tuple[HXSFile, memoryview] | None" = None
+# Stands in for objects defined by earlier roots, which trials only look up.
+_TRIAL_KNOWN = object()
+
+
+def _init_root_trial(
+    tables: SchemaTables,
+    shims_name: str | None,
+    lazy: bool,
+    diagnostics: "Diagnostics",
+    primitive_arrays: "PrimitiveArrays",
+    payload: bytes,
+) -> None:
+    global _root_trial
+    trial = HXSFile(
+        shims=shims_name,
+        lazy=lazy,
+        diagnostics=diagnostics,
+        primitive_arrays=primitive_arrays,
+    )
+    trial.classdefs = tables.classdefs
+    trial.schemas = tables.schemas
+    trial.enum_shims = tables.enum_shims
+    trial._class_index_by_name = tables.class_index_by_name
+    trial._class_index_by_clid = tables.class_index_by_clid
+    trial._span_data = payload
+    trial.objects = {}
+    _root_trial = (trial, memoryview(payload))
+
+
+def _try_root_schema(
+    schema_index: int, start: int, uid_val: int, uid_pos: int, known_count: int, new_uids: List[int]
+) -> Tuple[bool, int] | None:
+    """
+    Attempts the root at `start` with one schema; returns (succeeded, end or
+    error offset). `new_uids` are the last of the `known_count` UIDs defined
+    by earlier roots; returns None if this worker is missing older ones too.
+    """
+    assert _root_trial is not None
+    trial, data = _root_trial
+    known = trial.objects
+    missing = known_count - len(known)
+    if missing > len(new_uids):
+        return None
+    if missing > 0:
+        known.update(dict.fromkeys(new_uids[len(new_uids) - missing:], _TRIAL_KNOWN))  # type: ignore[arg-type]
+    f = ByteReader(data, start)
+    trial._read_context = []
+    if trial.index is not None:
+        trial.index = ObjectIndex()
+    schema = trial.schemas[schema_index]
+    try:
+        if trial.lazy:
+            trial._skip_definition(f, uid_val, uid_pos, schema)
+        else:
+            trial._read_definition(f, uid_val, uid_pos, schema)
+    except Exception:
+        return False, f.tell()
+    finally:
+        # Undo the attempt, as _read_root_object's rewind does.
+        for _ in range(len(known) - known_count):
+            known.popitem()
+        if uid_val in known:
+            known[uid_val] = _TRIAL_KNOWN  # type: ignore[assignment]
+    return True, f.tell()
+
+
+class HXSFile(Serialisable):
+    magic: String
+    version: SerialisableInt
+    classdefs: List[ClassDef]
+    schema_size: VarInt
+    schemas: List[Schema]
+    objects: Dict[int, Obj]  # uid, obj
+
+    # How many leading fields of each candidate schema are checked before a
+    # full root parse attempt is made with it.
+    root_probe_fields = 8
+
+    def __init__(
+        self,
+        shims: Optional[str]=None,
+        root_hints: RootSchemaHints | None = None,
+        lazy: bool = False,
+        index: bool = False,
+        diagnostics: Diagnostics | None = None,
+        primitive_arrays: PrimitiveArrays = "list",
+        schema_cache: SchemaTableCache | None = None,
+        root_workers: int = 1,
+    ) -> None:
+        self.magic = String("HXS")
+        self.version = SerialisableInt()
+        self.version.value = 1
+        self.version.length = 1
+        self.classdefs = []
+        self.schema_size = VarInt()
+        self.schemas = []
+        self.objects = {} # Read cache
+        self.obj: Obj | None = None
+        self.roots: List["Obj"] = []
+        self.raw_object_data: bytes | None = None
+        self.object_parse_error: Exception | None = None
+        # Where in the object graph the parse failed (e.g. "inventory.[3].owner"),
+        # if diagnostics allowed it to be found.
+        self.object_parse_path: str | None = None
+        self.unresolved_clids: List[Dict[str, Any]] = []
+        self.shims = shims
+        self.enum_shims: Dict[str, Any] = {}
+        # Classdef indices by class name and by runtime CLID hash (first
+        # occurrence wins); built by _link_and_resolve_references.
+        self._class_index_by_name: Dict[str, int] | None = None
+        self._class_index_by_clid: Dict[int, int] | None = None
+        # Root schema hints, if the caller opted in (see RootSchemaHints).
+        self.root_hints = root_hints
+        # Shared schema tables, if the caller opted in (see SchemaTableCache).
+        self.schema_cache = schema_cache
+        self.lazy = lazy
+        self.diagnostics: Diagnostics = diagnostics or ("full" if DEBUG else "paths-on-error")
+        # Traced decoders keep the path being read in _read_context.
+        self._tracing = self.diagnostics == "full"
+        if primitive_arrays == "numpy" and numpy is None:
+            raise ImportError('primitive_arrays="numpy" requires NumPy to be installed.')
+        self.primitive_arrays = primitive_arrays
+        # Compiled decoders are cached per tracing mode and array layout.
+        self._decoder_key = ("read-traced" if self._tracing else "read") + (
+            "" if primitive_arrays == "list" else f"/{primitive_arrays}"
+        )
+        self._steps_key = f"{self._decoder_key}/steps"
+        self._read_context: List[str] = []
+        # Processes to make root schema attempts in, when the schema isn't
+        # known from root_hints; the pool lives for one parse.
+        self.root_workers = root_workers
+        self._root_pool: ProcessPoolExecutor | None = None
+        # How many known UIDs were sent along with the last root's attempts.
+        self._root_pool_uids = 0
+        # Set by visit(): objects are reported to it instead of being kept.
+        self._visitor: ObjectVisitor | None = None
+
+        # Byte spans of every object read, if requested (lazy mode needs them).
+        self.index: ObjectIndex | None = ObjectIndex() if index or lazy else None
+        # The payload the index spans point into.
+        self._span_data: bytes | None = None
+        # Objects edited since they were read (see Obj.mark_dirty).
+        self.dirty_objects: Set[Obj] = set()
+        # Objects by full and short class name, built by objects_by_class()
+        # for the `objects` table it was built from.
+        self._class_objects: Dict[str, List[Obj]] | None = None
+        self._class_objects_key: Tuple[int, int] = (0, 0)
+
+        # Serialization state
+        self.buffer = ByteWriter()
+        self.written_objects: Dict[int, int] = {} # Python object id -> written UID
+        self.written_uids: Set[int] = set()
+        self.next_uid = 1
+        # Whether serialise() may copy clean, already-loaded objects verbatim.
+        self._splice_clean = False
+
+    def deserialise(self, f: Readable) -> "HXSFile":
+        if not isinstance(f, ByteReader):
+            f = ByteReader(f.read())
+        self.magic.deserialise(f)
+        assert self.magic.value == "HXS"
+        self.version.deserialise(f, length=1)
+        assert self.version.value == 1
+        cache = self.schema_cache
+        tables = None
+        if cache is not None:
+            header_start = f.tell()
+            header_end, schema_size = self._scan_schema_header(f)
+            cache_key = (
+                self.shims,
+                hashlib.blake2b(f.getbuffer()[header_start:header_end], digest_size=16).digest(),
+            )
+            tables = cache.get(cache_key)
+        if tables is not None:
+            self.classdefs = tables.classdefs
+            self.schemas = tables.schemas
+            self.enum_shims = tables.enum_shims
+            self._class_index_by_name = tables.class_index_by_name
+            self._class_index_by_clid = tables.class_index_by_clid
+            self.schema_size.value = schema_size
+            f.seek(header_end)
+        else:
+            self._read_schema_header(f)
+            if cache is not None:
+                cache.put(cache_key, SchemaTables(
+                    self.classdefs,
+                    self.schemas,
+                    self.enum_shims,
+                    self._class_index_by_name,  # type: ignore[arg-type]
+                    self._class_index_by_clid,  # type: ignore[arg-type]
+                ))
+        self.raw_object_data = f.read()
+        if self.index is not None:
+            self._span_data = self.raw_object_data
+        try:
+            self.obj = self._read_root_object(ByteReader(self.raw_object_data))
+        except Exception as e:
+            self.object_parse_error = e
+            self.objects = {}
+            self.obj = None
+            if self.diagnostics == "paths-on-error":
+                self._trace_parse_error()
+        finally:
+            if self._root_pool is not None:
+                self._root_pool.shutdown(wait=False, cancel_futures=True)
+                self._root_pool = None
+
+        return self
+
+    @staticmethod
+    def _scan_schema_header(f: ByteReader) -> Tuple[int, int]:
+        """
+        Returns where the classdef + schema section starting at `f` ends, and
+        the size of its schema block, without parsing it.
+        """
+        start = f.tell()
+        while True:
+            name_length = f.read_varint()
+            if name_length == 0:
+                break
+            f.advance(name_length - 1 + 6, "ClassDef")  # name, CLID, CRC32
+        schema_size = f.read_varint()
+        f.advance(schema_size, "schemas")
+        end = f.tell()
+        f.seek(start)
+        return end, schema_size
+
+    def _read_schema_header(self, f: ByteReader) -> None:
+        """Parses, links and shims the classdef + schema section."""
+        while True:
+            name = String().deserialise(f)
+            if name.value is None:
+                break
+            cdef = ClassDef()
+            cdef.name = name
+            cdef.deserialise(f)
+            self.classdefs.append(cdef)
+        self.schema_size.deserialise(f)
+        if self.schema_size.value > 0:
+            schemas_start_pos = f.tell()
+            schemas_end_pos = schemas_start_pos + self.schema_size.value
+            while f.tell() < schemas_end_pos:
+                self.schemas.append(Schema().deserialise(f))
+
+        self._link_and_resolve_references()
+        if self.shims is not None:
+            self._apply_type_shims(shims.shims_for(self.shims))
+            self.enum_shims = shims.enums_for(self.shims)
+        self._intern_field_types()
+
+    def _trace_parse_error(self) -> None:
+        """
+        Reads the object payload again with path tracking on, and takes the
+        error details from that run. Only done after a failed parse, so
+        successful loads never pay for tracking.
+        """
+        replay = HXSFile(
+            shims=self.shims,
+            diagnostics="full",
+            primitive_arrays=self.primitive_arrays,
+        )
+        replay.classdefs = self.classdefs
+        replay.schemas = self.schemas
+        replay.enum_shims = self.enum_shims
+        replay._class_index_by_name = self._class_index_by_name
+        replay._class_index_by_clid = self._class_index_by_clid
+        try:
+            replay._read_root_object(ByteReader(self.raw_object_data))  # type: ignore[arg-type]
+        except Exception as e:
+            self.object_parse_error = e
+            self.object_parse_path = replay.object_parse_path
+            self.unresolved_clids = replay.unresolved_clids
+
+    def _current_read_path(self) -> str:
+        if not self._read_context:
+            return "<root>"
+        return ".".join(self._read_context)
+
+    def _peek_stream_bytes(self, f: Readable, radius: int = 16) -> str | None:
+        if not isinstance(f, (BytesIO, ByteReader)):
+            return None
+        pos = f.tell()
+        data = f.getbuffer()
+        start = max(0, pos - radius)
+        end = min(len(data), pos + radius)
+        return bytes(data[start:end]).hex(" ")
+
+    def _record_unresolved_clid(
+        self,
+        clid: int,
+        declared_schema: "Schema | None",
+        f: Readable,
+    ) -> None:
+        declared_name = None
+        if declared_schema is not None and declared_schema.classdef is not None:
+            declared_name = declared_schema.classdef.name.value
+        self.unresolved_clids.append(
+            {
+                "clid": clid,
+                "path": self._current_read_path() if self._tracing else None,
+                "declared_schema": declared_name,
+                "offset": f.tell(),
+                "nearby_bytes": self._peek_stream_bytes(f),
+                "enclosing": self._enclosing_object_info(),
+            }
+        )
+
+    def _enclosing_object_info(self) -> Dict[str, Any] | None:
+        """Describes the object being read when indexing is enabled, for error reports."""
+        if self.index is None:
+            return None
+        obj = self.index.innermost()
+        if obj is None:
+            return None
+        span = self.index.span(self.index.entry_of(obj))
+        return {
+            "uid": span.uid,
+            "class": span.schema.classdef.name.value if span.schema.classdef else None,
+            "start": span.start,
+        }
+
+    def object_at(self, offset: int) -> Obj | None:
+        """
+        Returns the innermost object whose definition covers `offset` in
+        `raw_object_data`. Requires the file to have been read with
+        `index=True` (or `lazy=True`).
+        """
+        if self.index is None:
+            raise ValueError("Object index not built; read the file with index=True.")
+        return self.index.object_at(offset)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Approximate bytes held by the schema tables, the object graph, the
+        object index and the raw object payload, e.g. for comparing lazy and
+        eager loads. Anything shared is counted in the first part reaching it.
+        """
+        seen: Set[int] = set()
+        parts = {
+            "schemas": [self.classdefs, self.schemas],
+            "objects": [self.objects, self.roots],
+            "index": self.index,
+            "raw_object_data": self.raw_object_data,
+        }
+        return {
+            name: deep_sizeof(part, exclude=(HXSFile,), seen=seen)
+            for name, part in parts.items()
+        }
+
+    def span_of(self, uid: int) -> ObjectSpan:
+        """
+        Returns where the object with `uid` is defined in `raw_object_data`.
+        Requires the file to have been read with `index=True` (or `lazy=True`).
+        """
+        if self.index is None:
+            raise ValueError("Object index not built; read the file with index=True.")
+        return self.index.span_of(uid)
+
+    def pprint_unresolved_clids(self) -> str:
+        if not self.unresolved_clids:
             return "No unresolved runtime CLIDs recorded."
         lines = ["Unresolved runtime CLIDs:"]
         for item in self.unresolved_clids:
             declared = item["declared_schema"] or "<unknown>"
             lines.append(
-                f"  CLID {item['clid']} at {item['path']} "
+                f"  CLID {item['clid']} at {item['path'] or '<untracked path>'} "
                 f"(declared schema: {declared}, offset: 0x{item['offset']:x})"
             )
+            if item.get("enclosing"):
+                enclosing = item["enclosing"]
+                lines.append(
+                    f"    inside {enclosing['class'] or '<unknown>'} uid {enclosing['uid']} "
+                    f"(defined at 0x{enclosing['start']:x})"
+                )
             if item["nearby_bytes"]:
                 lines.append(f"    bytes: {item['nearby_bytes']}")
         return "\n".join(lines)
@@ -1258,6 +2608,41 @@ class HXSFile(Serialisable):
                         # Replace the old, incomplete PropType with the new one
                         schema.field_types[i] = new_prop_type
 
+    def _intern_field_types(self) -> None:
+        """
+        Replaces structurally identical schema field types with one shared,
+        frozen PropType, so each distinct type is stored, and has its decoders
+        compiled, only once per file.
+        """
+        interned: Dict[bytes, PropType] = {}
+        for schema in self.schemas:
+            types = schema.field_types
+            for i, prop_type in enumerate(types):
+                key = prop_type.serialise()
+                shared = interned.get(key)
+                if shared is None:
+                    shared = interned[key] = prop_type.freeze()
+                types[i] = shared
+
+    def _obj_layout(self, defn: ObjDef) -> ObjLayout:
+        """Returns the wire layout of `defn`'s anonymous objects, working it out on first use."""
+        layout = defn._layout
+        if layout is None:
+            names: List[str] = []
+            bits: List[int | None] = []
+            nullable = 0
+            for field_def in defn.fields:
+                names.append(field_def.name.value if field_def.name else f"<unnamed_{nullable}>")  # type: ignore[arg-type]
+                if self._is_field_nullable(field_def.type):
+                    bits.append(1 << nullable)
+                    nullable += 1
+                else:
+                    bits.append(None)
+            layout = defn._layout = ObjLayout(
+                tuple(names), tuple(bits), tuple(field_def.type for field_def in defn.fields), nullable
+            )
+        return layout
+
     def _is_field_nullable(self, prop_type: PropType | None) -> bool:
         """Determines if a field type is nullable according to hxbit rules."""
         if not prop_type or not prop_type.kind:
@@ -1283,188 +2668,914 @@ class HXSFile(Serialisable):
 
         return True
 
-    def _read_dynamic_value(self, f: BinaryIO | BytesIO) -> Any:
-        prefix = f.read(1)[0]
-        if prefix == 0: return None
-        if prefix == 1: return False
-        if prefix == 2: return True
-        if prefix == 3: return VarInt().deserialise(f).value
-        if prefix == 4: return struct.unpack("<f", f.read(4))[0]
-        if prefix == 5:
-            d = {}
-            count = VarInt().deserialise(f).value
-            for _ in range(count):
-                key = String().deserialise(f).value
-                value = self._read_dynamic_value(f)
-                if key is not None:
-                    d[key] = value
-            return d
-        if prefix == 6: return String().deserialise(f).value
-        if prefix == 7:
-            count = VarInt().deserialise(f).value
-            return [self._read_dynamic_value(f) for _ in range(count)]
-        if prefix == 8: return String().deserialise(f).value
-        if prefix == 9:
-             uid = VarInt().deserialise(f).value
-             return f"<Dynamic Object UID:{uid}>"
-        if prefix == 10:
-            enum_name = String().deserialise(f).value
-            constructor_index = VarInt().deserialise(f).value
-            return f"DynamicEnum<{enum_name}>({constructor_index})"
-        raise ValueError(f"Invalid dynamic type prefix: {prefix}")
-
-    def _read_value(self, f: BinaryIO | BytesIO, prop_type: PropType | None) -> Any:
+    # PDynamic values use hxbit's Serializer.addDynamic encoding: a tag byte,
+    # then 3: varint, 4: f32, 5: anonymous object (varint count, then
+    # string key + value pairs), 6: string, 7: array (varint count, then
+    # values), 8: bytes, 9: object reference (as PSerInterface), 10: enum
+    # (name string, constructor varint). 0 is null, 1 false and 2 true.
+
+    def _read_dynamic(self, f: ByteReader) -> Any:
+        """
+        Step decoder for PDynamic (see _compile_steps): scalars and known
+        references are returned as they are; anonymous objects, arrays and
+        new object definitions as a step generator.
+        """
+        tag = f.read_byte()
+        if tag == 0: return None
+        if tag == 1: return False
+        if tag == 2: return True
+        if tag == 3: return f.read_varint()
+        if tag == 4: return f.read_f32()
+        if tag == 6: return f.read_string()
+        if tag == 5 or tag == 7: return self._dynamic_container_steps(f, tag)
+        if tag == 8: return f.read_bytes()
+        if tag == 9: return self._read_ref(f, None)
+        if tag == 10: return self._read_dynamic_enum(f)
+        raise ValueError(f"Invalid dynamic type prefix: {tag}")
+
+    def _dynamic_container_steps(self, f: ByteReader, tag: int) -> Steps:
+        """Reads a dynamic anonymous object or array, nested ones included, in one loop."""
+        read_byte, read_varint, read_string = f.read_byte, f.read_varint, f.read_string
+        top: Dict[str, Any] | List[Any] = {} if tag == 5 else []
+        # [container, values left] per open container.
+        stack: List[List[Any]] = [[top, _dynamic_count(read_varint())]]
+        while stack:
+            frame = stack[-1]
+            if frame[1] == 0:
+                stack.pop()
+                continue
+            frame[1] -= 1
+            container = frame[0]
+            key = read_string() if type(container) is dict else None
+            tag = read_byte()
+            value: Any
+            if tag == 0: value = None
+            elif tag == 1: value = False
+            elif tag == 2: value = True
+            elif tag == 3: value = read_varint()
+            elif tag == 4: value = f.read_f32()
+            elif tag == 6: value = read_string()
+            elif tag == 5 or tag == 7:
+                value = {} if tag == 5 else []
+                stack.append([value, _dynamic_count(read_varint())])
+            elif tag == 8: value = f.read_bytes()
+            elif tag == 9:
+                value = self._read_ref(f, None)
+                if type(value) is GeneratorType:
+                    value = yield value
+            elif tag == 10: value = self._read_dynamic_enum(f)
+            else:
+                raise ValueError(f"Invalid dynamic type prefix: {tag}")
+            if type(container) is list:
+                container.append(value)
+            elif key is not None:
+                container[key] = value
+        return top
+
+    @staticmethod
+    def _read_dynamic_enum(f: ByteReader) -> DynamicEnum:
+        enum_name = f.read_string()
+        return DynamicEnum(enum_name, f.read_varint())
+
+    def _skip_dynamic(self, f: ByteReader) -> Steps | None:
+        """Step skipper for PDynamic, mirroring _read_dynamic."""
+        tag = f.read_byte()
+        if tag == 5 or tag == 7:
+            return self._skip_dynamic_container_steps(f, tag)
+        if tag == 9:
+            return self._skip_ref(f, None)
+        _skip_dynamic_scalar(f, tag)
+        return None
+
+    def _skip_dynamic_container_steps(self, f: ByteReader, tag: int) -> Steps:
+        read_byte, read_varint = f.read_byte, f.read_varint
+        # [has keys, values left] per open container.
+        stack: List[List[Any]] = [[tag == 5, _dynamic_count(read_varint())]]
+        while stack:
+            frame = stack[-1]
+            if frame[1] == 0:
+                stack.pop()
+                continue
+            frame[1] -= 1
+            if frame[0]:
+                f.read_string()
+            tag = read_byte()
+            if tag == 5 or tag == 7:
+                stack.append([tag == 5, _dynamic_count(read_varint())])
+            elif tag == 9:
+                nested = self._skip_ref(f, None)
+                if nested is not None:
+                    yield nested
+            else:
+                _skip_dynamic_scalar(f, tag)
+
+    def _write_dynamic(self, value: Any) -> Steps | None:
+        """Writes a PDynamic value; like _write_steps, returns a step generator if objects remain to be written."""
+        if isinstance(value, (dict, list, tuple, Obj)) and not isinstance(value, DynamicEnum):
+            return self._dynamic_write_steps(value)
+        self._write_dynamic_scalar(value)
+        return None
+
+    def _dynamic_write_steps(self, value: Any) -> Steps:
+        out = self.buffer
+        # Iterators of (key, value) per open container; keys are None in arrays.
+        stack: List[Iterator[Tuple[str | None, Any]]] = [iter(((None, value),))]
+        while stack:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                continue
+            key, value = item
+            if key is not None:
+                out.write_string(key)
+            if isinstance(value, Obj):
+                out.write_byte(9)
+                obj = self._begin_ref(value, None)
+                if obj is not None:
+                    yield self._fields_write_steps(obj)
+            elif isinstance(value, DynamicEnum):
+                self._write_dynamic_scalar(value)
+            elif isinstance(value, dict):
+                out.write_byte(5)
+                out.write_varint(len(value))
+                stack.append((str(k), v) for k, v in value.items())
+            elif isinstance(value, (list, tuple)):
+                out.write_byte(7)
+                out.write_varint(len(value))
+                stack.append((None, v) for v in value)
+            else:
+                self._write_dynamic_scalar(value)
+
+    def _write_dynamic_scalar(self, value: Any) -> None:
+        out = self.buffer
+        if value is None:
+            out.write_byte(0)
+        elif isinstance(value, bool):
+            out.write_byte(2 if value else 1)
+        elif isinstance(value, int):
+            out.write_byte(3)
+            out.write_varint(value)
+        elif isinstance(value, float):
+            out.write_byte(4)
+            out.write_f32(value)
+        elif isinstance(value, str):
+            out.write_byte(6)
+            out.write_string(value)
+        elif isinstance(value, DynamicEnum):
+            out.write_byte(10)
+            out.write_string(value.name)
+            out.write_varint(value.constructor)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            out.write_byte(8)
+            out.write_bytes(bytes(value))
+        else:
+            raise ValueError(f"Cannot write a {type(value).__name__} as a dynamic value.")
+
+    def _read_value(self, f: ByteReader, prop_type: PropType | None) -> Any:
         if prop_type is None: return None
-        if prop_type.kind is None: return None
+        return self._reader_for(prop_type)(self, f)
+
+    def _reader_for(self, prop_type: PropType) -> Decoder:
+        """
+        Returns the compiled decoder for `prop_type`, compiling it on first use.
+        Traced decoders (diagnostics="full") and other array layouts are
+        compiled and cached separately.
+        """
+        mode = self._decoder_key
+        reader = prop_type._compiled.get(mode)
+        if reader is None:
+            reader = prop_type._compiled[mode] = self._compile_reader(prop_type)
+        return reader
+
+    def _steps_for(self, prop_type: PropType) -> DecoderSteps:
+        """
+        Returns the step decoder for `prop_type`, compiling it on first use.
+        Only types that can hold references have one (see _compile_steps);
+        for anything else this is the plain decoder.
+        """
+        if not self._holds_refs(prop_type):
+            return self._reader_for(prop_type)
+        mode = self._steps_key
+        steps = prop_type._compiled.get(mode)
+        if steps is None:
+            steps = prop_type._compiled[mode] = self._compile_steps(prop_type)
+        return steps
+
+    def _holds_refs(self, prop_type: PropType | None) -> bool:
+        """
+        Whether a value of `prop_type` can contain object references, and so
+        objects defined inline. Only such values can nest without bound.
+        """
+        if prop_type is None or prop_type.kind is None:
+            return False
+        holds = prop_type._compiled.get("refs")
+        if holds is None:
+            kind, defn = prop_type.kind.kind, prop_type.defn
+            K = PropTypeDesc.Kind
+            if kind in (K.PSerializable, K.PSerInterface):
+                holds = True
+            elif kind in (K.PArray, K.PVector, K.PNull, K.PAlias, K.PAliasCDB, K.PNoSave) and isinstance(defn, TypeDef):
+                holds = self._holds_refs(defn.type)
+            elif kind == K.PMap and isinstance(defn, MapDef):
+                holds = self._holds_refs(defn.key_type) or self._holds_refs(defn.value_type)
+            elif kind == K.PObj and isinstance(defn, ObjDef):
+                holds = any(self._holds_refs(field_def.type) for field_def in defn.fields)
+            elif kind == K.PDynamic:
+                holds = True
+            elif kind == K.PEnum and isinstance(defn, NameDef):
+                ctors = (self.enum_shims.get(defn.name.value) if defn.name.value else None) or []
+                holds = any(
+                    self._holds_refs(self._create_proptype_from_shim(arg_shim))
+                    for ctor in ctors
+                    for arg_shim in ctor["args"]
+                )
+            else:
+                holds = False
+            prop_type._compiled["refs"] = holds
+        return holds
+
+    def _schema_steps_for(self, schema: "Schema") -> ObjDecoderSteps:
+        """Returns the compiled field decoder for `schema`, compiling it on first use."""
+        mode = self._decoder_key
+        steps = schema._compiled.get(mode)
+        if steps is None:
+            steps = schema._compiled[mode] = self._compile_schema_steps(schema)
+        return steps
+
+    def _compile_schema_steps(self, schema: "Schema") -> ObjDecoderSteps:
+        class_name = schema.classdef.name.value if schema.classdef else "Unknown"
+        fields: List[Tuple[str, DecoderSteps]] = []
+        for i, field_name in enumerate(schema.field_names):
+            assert field_name.value is not None
+            fields.append((field_name.value, self._steps_for(schema.field_types[i])))
+        plan = tuple(fields)
+        store = dict.__setitem__  # fills a FieldDict without marking it dirty
+
+        if not self._tracing:
+            def read_fields(ctx: "HXSFile", f: ByteReader, out: Dict[str, Any]) -> Steps:
+                for name, read in plan:
+                    value = read(ctx, f)
+                    if type(value) is GeneratorType:
+                        value = yield value
+                    store(out, name, value)
+            return read_fields
+
+        # Traced decoders deliberately don't pop on the way out of an error,
+        # so _read_context still holds the failing path when it's caught.
+        def read_fields_traced(ctx: "HXSFile", f: ByteReader, out: Dict[str, Any]) -> Steps:
+            tell(f"Class {class_name}")
+            context = ctx._read_context
+            for name, read in plan:
+                context.append(name)
+                value = read(ctx, f)
+                if type(value) is GeneratorType:
+                    value = yield value
+                store(out, name, value)
+                context.pop()
+
+        return read_fields_traced
+
+    def _compile_reader(self, prop_type: PropType) -> Decoder:
+        """
+        Builds a decoder closure specialised for `prop_type`. The kind dispatch
+        (and any nested type, schema or shim lookup) happens once here instead
+        of on every value read.
+        """
+        if prop_type.kind is None:
+            return lambda ctx, f: None
+        if self._holds_refs(prop_type):
+            steps = self._steps_for(prop_type)
+
+            def read_complete(ctx: "HXSFile", f: ByteReader) -> Any:
+                value = steps(ctx, f)
+                return walk(value) if type(value) is GeneratorType else value
+            return read_complete
+        kind, defn = prop_type.kind.kind, prop_type.defn
+        K = PropTypeDesc.Kind
+
+        if kind in (K.PInt, K.PFlags):
+            return lambda ctx, f: f.read_varint()
+        if kind == K.PFloat:
+            return lambda ctx, f: f.read_f32()
+        if kind == K.PBool:
+            return lambda ctx, f: f.read_byte() != 0
+        if kind == K.PInt64:
+            return lambda ctx, f: f.read_i64()
+        if kind == K.PString:
+            return lambda ctx, f: f.read_string()
+        if kind == K.PBytes:
+            return lambda ctx, f: f.read_bytes()
+        if kind in (K.PArray, K.PVector) and isinstance(defn, TypeDef):
+            bulk_reader = self._compile_primitive_array_reader(defn.type)
+            if bulk_reader is not None:
+                return bulk_reader
+            item_reader = self._reader_for(defn.type)
+
+            if not self._tracing:
+                def read_array(ctx: "HXSFile", f: ByteReader) -> List[Any] | None:
+                    count = f.read_varint()
+                    if count == 0: return None
+                    return [item_reader(ctx, f) for _ in range(count - 1)]
+                return read_array
+
+            def read_array_traced(ctx: "HXSFile", f: ByteReader) -> List[Any] | None:
+                count = f.read_varint()
+                if count == 0: return None
+                context = ctx._read_context
+                values = []
+                for i in range(count - 1):
+                    context.append(f"[{i}]")
+                    values.append(item_reader(ctx, f))
+                    context.pop()
+                return values
+            return read_array_traced
+        if kind == K.PMap and isinstance(defn, MapDef):
+            key_reader = self._reader_for(defn.key_type)
+            value_reader = self._reader_for(defn.value_type)
+
+            if not self._tracing:
+                def read_map(ctx: "HXSFile", f: ByteReader) -> Dict[Any, Any] | None:
+                    count = f.read_varint()
+                    if count == 0: return None
+                    values = {}
+                    for _ in range(count - 1):
+                        key = key_reader(ctx, f)
+                        values[key] = value_reader(ctx, f)
+                    return values
+                return read_map
+
+            def read_map_traced(ctx: "HXSFile", f: ByteReader) -> Dict[Any, Any] | None:
+                count = f.read_varint()
+                if count == 0: return None
+                context = ctx._read_context
+                values = {}
+                for i in range(count - 1):
+                    context.append(f"<key:{i}>")
+                    key = key_reader(ctx, f)
+                    context[-1] = f"[{key!r}]"
+                    values[key] = value_reader(ctx, f)
+                    context.pop()
+                return values
+            return read_map_traced
+        if kind == K.PEnum and isinstance(defn, NameDef):
+            return self._compile_enum_reader(defn.name.value)
+        if kind == K.PNull and isinstance(defn, TypeDef):
+            inner = self._reader_for(defn.type)
+            return lambda ctx, f: inner(ctx, f) if f.read_byte() != 0 else None
+        if kind in (K.PAlias, K.PAliasCDB, K.PNoSave) and isinstance(defn, TypeDef):
+            return self._reader_for(defn.type)
+        if kind == K.PObj and isinstance(defn, ObjDef):
+            return self._compile_obj_reader(defn)
+
+        def unsupported(ctx: "HXSFile", f: ByteReader) -> Any:
+            raise NotImplementedError(f"Deserialization for {kind.name} is not implemented.")
+        return unsupported
+
+    def _compile_steps(self, prop_type: PropType) -> DecoderSteps:
+        """
+        Builds the step decoder for a type that can hold references. It
+        mirrors _compile_reader, except that reading an object definition is
+        left to the walker: a reference to an object not seen yet returns a
+        step generator reading it, and containers of such values are
+        themselves step generators. Every caller checks for a generator and
+        yields it, so objects nested inside objects never recurse.
+        """
+        assert prop_type.kind is not None
         kind, defn = prop_type.kind.kind, prop_type.defn
+        K = PropTypeDesc.Kind
 
-        if kind in [PropTypeDesc.Kind.PInt, PropTypeDesc.Kind.PFlags]: return VarInt().deserialise(f).value
-        if kind == PropTypeDesc.Kind.PFloat: return struct.unpack("<f", f.read(4))[0]
-        if kind == PropTypeDesc.Kind.PBool: return f.read(1)[0] != 0
-        if kind == PropTypeDesc.Kind.PInt64: return struct.unpack("<q", f.read(8))[0]
-        if kind == PropTypeDesc.Kind.PString: return String().deserialise(f).value
-        if kind == PropTypeDesc.Kind.PBytes:
-            length = VarInt().deserialise(f).value
-            if length == 0: return None
-            return f.read(length - 1)
-        if kind in [PropTypeDesc.Kind.PArray, PropTypeDesc.Kind.PVector] and isinstance(defn, TypeDef):
-            count = VarInt().deserialise(f).value
-            if count == 0: return None
-            values = []
-            for i in range(count - 1):
-                self._push_read_context(f"[{i}]")
-                try:
-                    values.append(self._read_value(f, defn.type))
-                finally:
-                    self._pop_read_context()
-            return values
-        if kind == PropTypeDesc.Kind.PMap and isinstance(defn, MapDef):
-            count = VarInt().deserialise(f).value
+        if kind in (K.PSerializable, K.PSerInterface):
+            schema = (
+                self._get_schema_by_name(defn.name.value)
+                if kind == K.PSerializable and isinstance(defn, NameDef)
+                else None
+            )
+            return lambda ctx, f: ctx._read_ref(f, schema)
+        if kind in (K.PAlias, K.PAliasCDB, K.PNoSave) and isinstance(defn, TypeDef):
+            return self._steps_for(defn.type)
+        if kind == K.PNull and isinstance(defn, TypeDef):
+            inner = self._steps_for(defn.type)
+            return lambda ctx, f: inner(ctx, f) if f.read_byte() != 0 else None
+        if kind in (K.PArray, K.PVector) and isinstance(defn, TypeDef):
+            item_reader = self._steps_for(defn.type)
+
+            if not self._tracing:
+                def read_array(ctx: "HXSFile", f: ByteReader) -> Steps:
+                    count = f.read_varint()
+                    if count == 0: return None
+                    values = []
+                    for _ in range(count - 1):
+                        value = item_reader(ctx, f)
+                        if type(value) is GeneratorType:
+                            value = yield value
+                        values.append(value)
+                    return values
+                return read_array
+
+            def read_array_traced(ctx: "HXSFile", f: ByteReader) -> Steps:
+                count = f.read_varint()
+                if count == 0: return None
+                context = ctx._read_context
+                values = []
+                for i in range(count - 1):
+                    context.append(f"[{i}]")
+                    value = item_reader(ctx, f)
+                    if type(value) is GeneratorType:
+                        value = yield value
+                    values.append(value)
+                    context.pop()
+                return values
+            return read_array_traced
+        if kind == K.PMap and isinstance(defn, MapDef):
+            key_reader = self._steps_for(defn.key_type)
+            value_reader = self._steps_for(defn.value_type)
+            tracing = self._tracing
+
+            def read_map(ctx: "HXSFile", f: ByteReader) -> Steps:
+                count = f.read_varint()
+                if count == 0: return None
+                context = ctx._read_context
+                values = {}
+                for i in range(count - 1):
+                    if tracing:
+                        context.append(f"<key:{i}>")
+                    key = key_reader(ctx, f)
+                    if type(key) is GeneratorType:
+                        key = yield key
+                    if tracing:
+                        context[-1] = f"[{key!r}]"
+                    value = value_reader(ctx, f)
+                    if type(value) is GeneratorType:
+                        value = yield value
+                    values[key] = value
+                    if tracing:
+                        context.pop()
+                return values
+            return read_map
+        if kind == K.PEnum and isinstance(defn, NameDef):
+            return self._compile_enum_steps(defn.name.value)
+        if kind == K.PObj and isinstance(defn, ObjDef):
+            return self._compile_obj_steps(defn)
+        if kind == K.PDynamic:
+            return lambda ctx, f: ctx._read_dynamic(f)
+        return self._compile_reader(prop_type)
+
+    def _compile_primitive_array_reader(self, item_type: PropType) -> Decoder | None:
+        """
+        Decodes arrays of PInt, PFloat or PBool in one bulk read instead of
+        one decoder call per element (see PrimitiveArrays).
+        """
+        item_kind = item_type.kind.kind if item_type.kind else None
+        K = PropTypeDesc.Kind
+        layout = self.primitive_arrays
+        convert: Callable[[Any], Any]
+        if item_kind == K.PInt:
+            read = ByteReader.read_varints
+            if layout == "list":
+                convert = lambda values: values
+            elif layout == "array":
+                convert = lambda values: array("i", values)
+            else:
+                convert = lambda values: numpy.array(values, dtype=numpy.int32)
+        elif item_kind == K.PFloat:
+            read = ByteReader.read_f32s  # type: ignore[assignment]
+            if layout == "list":
+                convert = array.tolist
+            elif layout == "array":
+                convert = lambda values: values
+            else:
+                convert = lambda values: numpy.array(values, dtype=numpy.float32)
+        elif item_kind == K.PBool:
+            read = ByteReader.read_bools  # type: ignore[assignment]
+            if layout == "list":
+                convert = lambda values: list(map(bool, values))
+            elif layout == "array":
+                convert = lambda values: array("B", values)
+            else:
+                convert = lambda values: numpy.frombuffer(values, dtype=numpy.uint8).astype(bool)
+        else:
+            return None
+
+        def read_primitive_array(ctx: "HXSFile", f: ByteReader) -> Any:
+            count = f.read_varint()
             if count == 0: return None
-            values = {}
-            for i in range(count - 1):
-                self._push_read_context(f"<key:{i}>")
-                try:
-                    key = self._read_value(f, defn.key_type)
-                finally:
-                    self._pop_read_context()
-                self._push_read_context(f"[{key!r}]")
-                try:
-                    values[key] = self._read_value(f, defn.value_type)
-                finally:
-                    self._pop_read_context()
-            return values
-        if kind == PropTypeDesc.Kind.PSerializable and isinstance(defn, NameDef):
-            schema = self._get_schema_by_name(defn.name.value)
-            return self._read_ref(f, schema)
-        if kind == PropTypeDesc.Kind.PSerInterface:
-            return self._read_ref(f, None)
-        if kind == PropTypeDesc.Kind.PEnum and isinstance(defn, NameDef):
-            constructor = f.read(1)[0]
+            return convert(read(f, max(count - 1, 0)))  # like range(count - 1)
+        return read_primitive_array
+
+    def _compile_enum_reader(self, enum_name: str | None) -> Decoder:
+        ctors = self.enum_shims.get(enum_name) if enum_name else None
+        # Constructor argument decoders, built once per shimmed constructor.
+        arg_readers: List[Tuple[str, Tuple[Decoder, ...]] | None] = []
+        for ctor in ctors or []:
+            if not ctor["args"]:
+                arg_readers.append(None)
+                continue
+            readers = tuple(
+                self._reader_for(self._create_proptype_from_shim(arg_shim))
+                for arg_shim in ctor["args"]
+            )
+            arg_readers.append((ctor["name"], readers))
+        tracing = self._tracing
+
+        def read_enum(ctx: "HXSFile", f: ByteReader) -> Any:
+            constructor = f.read_byte()
             if constructor == 0:
                 return None
             index = constructor - 1
-            enum_name = defn.name.value
-            ctors = self.enum_shims.get(enum_name) if enum_name else None
-            if ctors and index < len(ctors) and ctors[index]["args"]:
-                ctor = ctors[index]
-                args = []
-                for j, arg_shim in enumerate(ctor["args"]):
-                    self._push_read_context(f"{enum_name}.{ctor['name']}<arg{j}>")
-                    try:
-                        args.append(
-                            self._read_value(f, self._create_proptype_from_shim(arg_shim))
-                        )
-                    finally:
-                        self._pop_read_context()
+            ctor = arg_readers[index] if index < len(arg_readers) else None
+            if ctor is not None:
+                ctor_name, readers = ctor
+                if tracing:
+                    context = ctx._read_context
+                    args = []
+                    for j, reader in enumerate(readers):
+                        context.append(f"{enum_name}.{ctor_name}<arg{j}>")
+                        args.append(reader(ctx, f))
+                        context.pop()
+                else:
+                    args = [reader(ctx, f) for reader in readers]
                 return {
                     "__enum__": enum_name,
                     "constructor": index,
-                    "name": ctor["name"],
+                    "name": ctor_name,
                     "args": args,
                 }
             return f"Enum<{enum_name}>({index})"
-        if kind == PropTypeDesc.Kind.PNull and isinstance(defn, TypeDef):
-            return self._read_value(f, defn.type) if f.read(1)[0] != 0 else None
-        if kind == PropTypeDesc.Kind.PAlias and isinstance(defn, TypeDef):
-            return self._read_value(f, defn.type)
-        if kind == PropTypeDesc.Kind.PAliasCDB and isinstance(defn, TypeDef):
-            return self._read_value(f, defn.type)
-        if kind == PropTypeDesc.Kind.PNoSave and isinstance(defn, TypeDef):
-            return self._read_value(f, defn.type)
-        if kind == PropTypeDesc.Kind.PObj and isinstance(defn, ObjDef):
-            bits = VarInt().deserialise(f).value
+
+        return read_enum
+
+    def _compile_obj_reader(self, defn: ObjDef) -> Decoder:
+        # (name, presence bit or None if the field is always present, decoder
+        # or None for the untyped string hack), resolved once per ObjDef.
+        layout = self._obj_layout(defn)
+        fields: Tuple[Tuple[str, int | None, Decoder | None], ...] = tuple(
+            (field_name, bit, self._reader_for(field_type) if field_type else None)
+            for field_name, bit, field_type in zip(layout.names, layout.bits, layout.types)
+        )
+
+        if not self._tracing:
+            def read_obj(ctx: "HXSFile", f: ByteReader) -> Dict[str, Any] | None:
+                bits = f.read_varint()
+                if bits == 0: return None
+                bits -= 1
+                obj_data = {}
+                for field_name, bit, reader in fields:
+                    if bit is not None and not bits & bit:
+                        continue
+                    obj_data[field_name] = reader(ctx, f) if reader is not None else f.read_string()
+                return obj_data
+            return read_obj
+
+        def read_obj_traced(ctx: "HXSFile", f: ByteReader) -> Dict[str, Any] | None:
+            bits = f.read_varint()
             if bits == 0: return None
             bits -= 1
-            obj_data, bit_idx = {}, 0
-            for field_def in defn.fields:
-                field_name = field_def.name.value if field_def.name else f"<unnamed_{bit_idx}>"
-                is_present = True
-                if self._is_field_nullable(field_def.type):
-                    is_present = (bits & (1 << bit_idx)) != 0
-                    bit_idx += 1
-                if is_present:
-                    if field_def.type:
-                        tell(f"_read_value field {field_name}: {field_def.type.kind.kind} ") # type: ignore
-                        obj_data[field_name] = self._read_value(f, field_def.type)
-                        tell(f"value: {obj_data[field_name]}")
-                    else:
-                        tell(f"string hack {field_name}")
-                        obj_data[field_name] = String().deserialise(f).value
+            context = ctx._read_context
+            obj_data = {}
+            for field_name, bit, reader in fields:
+                if bit is not None and not bits & bit:
+                    continue
+                context.append(field_name)
+                if reader is not None:
+                    tell(f"_read_value field {field_name}")
+                    obj_data[field_name] = reader(ctx, f)
+                    tell(f"value: {obj_data[field_name]}")
+                else:
+                    tell(f"string hack {field_name}")
+                    obj_data[field_name] = f.read_string()
+                context.pop()
             return obj_data
-        
-        raise NotImplementedError(f"Deserialization for {kind.name} is not implemented.")
 
-    def _read_root_object(self, f: BinaryIO | BytesIO) -> "Obj | None":
+        return read_obj_traced
+
+    def _compile_enum_steps(self, enum_name: str | None) -> DecoderSteps:
+        """The step decoder for an enum with constructor arguments that can hold references."""
+        ctors = self.enum_shims.get(enum_name) if enum_name else None
+        arg_readers: List[Tuple[str, Tuple[DecoderSteps, ...]] | None] = []
+        for ctor in ctors or []:
+            if not ctor["args"]:
+                arg_readers.append(None)
+                continue
+            readers = tuple(
+                self._steps_for(self._create_proptype_from_shim(arg_shim))
+                for arg_shim in ctor["args"]
+            )
+            arg_readers.append((ctor["name"], readers))
+        tracing = self._tracing
+
+        def read_enum(ctx: "HXSFile", f: ByteReader) -> Steps:
+            constructor = f.read_byte()
+            if constructor == 0:
+                return None
+            index = constructor - 1
+            ctor = arg_readers[index] if index < len(arg_readers) else None
+            if ctor is None:
+                return f"Enum<{enum_name}>({index})"
+            ctor_name, readers = ctor
+            context = ctx._read_context
+            args = []
+            for j, reader in enumerate(readers):
+                if tracing:
+                    context.append(f"{enum_name}.{ctor_name}<arg{j}>")
+                value = reader(ctx, f)
+                if type(value) is GeneratorType:
+                    value = yield value
+                args.append(value)
+                if tracing:
+                    context.pop()
+            return {
+                "__enum__": enum_name,
+                "constructor": index,
+                "name": ctor_name,
+                "args": args,
+            }
+
+        return read_enum
+
+    def _compile_obj_steps(self, defn: ObjDef) -> DecoderSteps:
+        """The step decoder for an anonymous object with fields that can hold references."""
+        layout = self._obj_layout(defn)
+        fields: Tuple[Tuple[str, int | None, DecoderSteps | None], ...] = tuple(
+            (field_name, bit, self._steps_for(field_type) if field_type else None)
+            for field_name, bit, field_type in zip(layout.names, layout.bits, layout.types)
+        )
+        tracing = self._tracing
+
+        def read_obj(ctx: "HXSFile", f: ByteReader) -> Steps:
+            bits = f.read_varint()
+            if bits == 0: return None
+            bits -= 1
+            context = ctx._read_context
+            obj_data = {}
+            for field_name, bit, reader in fields:
+                if bit is not None and not bits & bit:
+                    continue
+                if tracing:
+                    context.append(field_name)
+                if reader is not None:
+                    value = reader(ctx, f)
+                    if type(value) is GeneratorType:
+                        value = yield value
+                else:
+                    value = f.read_string()  # the untyped string hack
+                obj_data[field_name] = value
+                if tracing:
+                    context.pop()
+            return obj_data
+
+        return read_obj
+
+    def _probe_for(self, prop_type: PropType) -> Probe:
+        """Returns the compiled root probe for `prop_type`, compiling it on first use."""
+        probe = prop_type._compiled.get("probe")
+        if probe is None:
+            probe = prop_type._compiled["probe"] = self._compile_probe(prop_type)
+        return probe
+
+    def _compile_probe(self, prop_type: PropType) -> Probe:
+        """
+        Builds a cheap plausibility check for a value of `prop_type`: scalars
+        are read, containers and references only have their header checked
+        (counts must fit in the remaining data, new polymorphic references
+        must name a known class), and probing stops before anything that would
+        need the object graph to be decoded. A probe never rejects data the
+        decoder would accept, so it can only rule out schemas that would fail.
+        """
+        if prop_type.kind is None:
+            return lambda ctx, f: True
+        kind, defn = prop_type.kind.kind, prop_type.defn
+        K = PropTypeDesc.Kind
+
+        def sized(item: PropType | None) -> bool:
+            # Whether every value of `item` takes at least one byte.
+            while item is not None and item.kind is not None:
+                if item.kind.kind not in (K.PAlias, K.PAliasCDB, K.PNoSave):
+                    return True
+                item = item.defn.type if isinstance(item.defn, TypeDef) else None
+            return False
+
+        if isinstance(defn, MapDef):
+            bounded = sized(defn.key_type) or sized(defn.value_type)
+        else:
+            bounded = isinstance(defn, TypeDef) and sized(defn.type)
+
+        def count(f: ByteReader) -> int:
+            # Like the decoders, a count below 1 means no elements.
+            n = f.read_varint()
+            if bounded and n - 1 > f.end - f.pos:
+                raise ValueError(f"Implausible element count {n - 1}.")
+            return n
+
+        def consume(read: Callable[[ByteReader], Any]) -> Probe:
+            def probe(ctx: "HXSFile", f: ByteReader) -> bool:
+                read(f)
+                return True
+            return probe
+
+        if kind in (K.PInt, K.PFlags):
+            return consume(ByteReader.read_varint)
+        if kind == K.PFloat:
+            return consume(ByteReader.read_f32)
+        if kind == K.PInt64:
+            return consume(ByteReader.read_i64)
+        if kind == K.PBool:
+            return consume(ByteReader.read_byte)
+        if kind == K.PString:
+            return consume(ByteReader.read_string)
+        if kind == K.PBytes:
+            return consume(ByteReader.read_bytes)
+        if kind in (K.PArray, K.PVector, K.PMap):
+            return lambda ctx, f: count(f) <= 1
+        if kind in (K.PSerializable, K.PSerInterface):
+            schema = (
+                self._get_schema_by_name(defn.name.value)
+                if kind == K.PSerializable and isinstance(defn, NameDef)
+                else None
+            )
+            polymorphic = schema is None or schema.clid.value == 0
+
+            def probe_ref(ctx: "HXSFile", f: ByteReader) -> bool:
+                uid = f.read_varint()
+                if uid == 0 or uid in ctx.objects:
+                    return True
+                if polymorphic:
+                    ctx._get_schema_by_clid(f.read_u16_be())
+                return False
+            return probe_ref
+        if kind == K.PEnum and isinstance(defn, NameDef):
+            ctors = (self.enum_shims.get(defn.name.value) if defn.name.value else None) or []
+
+            def probe_enum(ctx: "HXSFile", f: ByteReader) -> bool:
+                index = f.read_byte() - 1
+                # Shimmed constructor arguments follow: stop before them.
+                return index < 0 or index >= len(ctors) or not ctors[index]["args"]
+            return probe_enum
+        if kind == K.PNull and isinstance(defn, TypeDef):
+            inner = self._probe_for(defn.type)
+            return lambda ctx, f: f.read_byte() == 0 or inner(ctx, f)
+        if kind in (K.PAlias, K.PAliasCDB, K.PNoSave) and isinstance(defn, TypeDef):
+            return self._probe_for(defn.type)
+        if kind == K.PObj and isinstance(defn, ObjDef):
+            # Bits beyond the nullable fields are ignored when decoding.
+            return lambda ctx, f: f.read_varint() == 0
+        if kind == K.PDynamic:
+            def probe_dynamic(ctx: "HXSFile", f: ByteReader) -> bool:
+                tag = f.read_byte()
+                if tag > 10:
+                    raise ValueError(f"Invalid dynamic type prefix: {tag}")
+                return tag <= 2
+            return probe_dynamic
+
+        def unsupported(ctx: "HXSFile", f: ByteReader) -> bool:
+            raise NotImplementedError(f"Deserialization for {kind.name} is not implemented.")
+        return unsupported
+
+    def _probe_root_schema(self, f: ByteReader, start: int, schema: "Schema") -> bool:
+        """
+        Checks the first few fields of a root object at `start` against
+        `schema`. Returns False only if the bytes can't be an object of that
+        schema, i.e. if a full parse attempt would fail.
+        """
+        f.seek(start)
+        try:
+            if schema.clid.value == 0:
+                schema = self._get_schema_by_clid(f.read_u16_be())
+            for field_type in schema.field_types[:self.root_probe_fields]:
+                if not self._probe_for(field_type)(self, f):
+                    break
+            return True
+        except Exception:
+            return False
+
+    def _read_root_object(self, f: ByteReader) -> "Obj | None":
         # The root class is not stored in the file: the game passes it to
         # hxbit's unserializer. A file may also contain several root objects
         # back to back (e.g. Dead Cells' "UserAndGameData"). For each root,
         # try every schema and keep the one that consumes the most data,
-        # preferring one that reaches the end of the buffer.
-        total = len(f.getbuffer()) if isinstance(f, BytesIO) else None
+        # preferring one that reaches the end of the buffer. Files with the
+        # same class definitions (i.e. from the same build) have the same root
+        # classes, so with root_hints the schema that won last time for a root
+        # index goes first; it is taken as is only if it reaches the end of the
+        # buffer, and otherwise has to beat the other candidates like any of
+        # them. Otherwise candidates are pre-filtered with a cheap probe of their
+        # first few fields, and only the survivors get a full parse attempt,
+        # in parallel if root_workers allows (see _score_root_attempts).
+        total = len(f.getbuffer()) if isinstance(f, (BytesIO, ByteReader)) else None
         roots: List[Obj] = []
-        saved_objects: Dict[int, Obj] = {}
+        self.objects = {}
+        hints = self.root_hints
+        hint_crc = zlib.crc32(
+            "\n".join(cdef.name.value or "" for cdef in self.classdefs).encode("utf-8")
+        ) if hints is not None else 0
 
         while True:
-            uid_val = VarInt().deserialise(f).value
+            uid_pos = f.tell()
+            uid_val = f.read_varint()
             if uid_val == 0:
                 break
             start = f.tell()
 
+            saved_index = len(self.index) if self.index is not None else 0
+            # Attempts share one object table instead of each copying it.
+            # Definitions only add UIDs and dicts keep insertion order, so an
+            # attempt is undone by popping what it added; keeping it is free.
+            saved_count = len(self.objects)
+            shadowed = self.objects.get(uid_val)
+
+            def rewind() -> None:
+                objects = self.objects
+                for _ in range(len(objects) - saved_count):
+                    objects.popitem()
+                if shadowed is not None:
+                    objects[uid_val] = shadowed
+
             def attempt(schema: "Schema") -> "Obj":
                 f.seek(start)
-                self.objects = dict(saved_objects)
+                rewind()
                 self._read_context = []
                 self.unresolved_clids = []
-                resolved = self._resolve_runtime_schema(f, schema)
-                obj = Obj(resolved, self)
-                self.objects[uid_val] = obj
-                obj.deserialise(f)
-                return obj
+                if self.index is not None:
+                    self.index.truncate(saved_index)
+                if self.lazy or self._visitor is not None:
+                    return self._skip_definition(f, uid_val, uid_pos, schema)
+                return self._read_definition(f, uid_val, uid_pos, schema)
 
             chosen: Obj | None = None
-            best_schema: "Schema | None" = None
-            best_pos = -1
+            chosen_schema: "Schema | None" = None
+            hint_key = (hint_crc, len(roots))
+            hinted = self._get_schema_by_name(hints.get(hint_key)) if hints is not None else None
+            hinted_pos = -1
+            if hinted is not None:
+                try:
+                    obj = attempt(hinted)
+                except Exception:
+                    pass
+                else:
+                    if f.tell() > start and (total is None or f.tell() == total):
+                        chosen, chosen_schema = obj, hinted
+                    elif f.tell() > start:
+                        # A partial parse (a later root, or a stale hint):
+                        # only the full search can tell whether it's the best.
+                        hinted_pos = f.tell()
+
+            best_schema: "Schema | None" = hinted if hinted_pos >= 0 else None
+            best_pos = hinted_pos
             best_err: Exception | None = None
             best_err_pos = -1
-            for schema in self.schemas:
+            best_err_path: str | None = None
+            candidates: List[Schema] = []
+            if chosen is None:
+                rewind()
+                # The probe only filters: survivors keep their schema order,
+                # which decides between candidates that parse equally far.
+                candidates = [
+                    schema for schema in self.schemas
+                    if self._probe_root_schema(f, start, schema)
+                ]
+                # If nothing survives, fall back to full attempts so the
+                # deepest parse error is still the one reported.
+                if not candidates:
+                    candidates = self.schemas
+                scored = self._score_root_attempts(
+                    ([hinted] if hinted_pos >= 0 else [])  # type: ignore[list-item]
+                    + [schema for schema in candidates if schema is not hinted],
+                    start, uid_val, uid_pos, self.objects, total,
+                )
+                if scored is not None:
+                    # Only the outcome is known; redo the winning attempt here
+                    # (or the failing one, for its error and path).
+                    best_schema, failed = scored
+                    candidates = []
+                    if best_schema is None and failed is not None:
+                        try:
+                            chosen, chosen_schema = attempt(failed), failed
+                        except Exception:
+                            if self._tracing:
+                                self.object_parse_path = self._current_read_path()
+                            raise
+            for schema in candidates:
+                if schema is hinted:
+                    continue
                 try:
                     obj = attempt(schema)
                 except Exception as e:
                     if f.tell() > best_err_pos:
                         best_err_pos = f.tell()
                         best_err = e
+                        if self._tracing:
+                            best_err_path = self._current_read_path()
                     continue
                 if total is None or f.tell() == total:
-                    chosen = obj
+                    chosen, chosen_schema = obj, schema
                     break
                 if f.tell() > best_pos:
                     best_pos = f.tell()
                     best_schema = schema
             if chosen is None:
                 if best_schema is not None:
-                    chosen = attempt(best_schema)
+                    chosen, chosen_schema = attempt(best_schema), best_schema
                 elif best_err is not None:
+                    self.object_parse_path = best_err_path
                     raise best_err
                 else:
                     raise ValueError("No schema produced a valid root object parse.")
@@ -1472,143 +3583,615 @@ class HXSFile(Serialisable):
                 raise ValueError(
                     f"Root object parse made no progress at offset 0x{start:x}."
                 )
+            if self._visitor is not None:
+                # Attempts only skipped; read the chosen one for the visitor.
+                end = f.tell()
+                f.seek(start)
+                rewind()
+                chosen = self._read_definition(f, uid_val, uid_pos, chosen_schema)  # type: ignore[arg-type]
+                assert f.tell() == end
+            if hints is not None and chosen_schema is not None and chosen_schema.classdef is not None:
+                class_name = chosen_schema.classdef.name.value
+                if class_name is not None:
+                    hints.put(hint_key, class_name)
             roots.append(chosen)
-            saved_objects = self.objects
             if total is None or f.tell() >= total:
                 break
 
         self.roots = roots
         return roots[0] if roots else None
 
-    def _read_ref(self, f: BinaryIO | BytesIO, schema: "Schema | None") -> "Obj | None":
-        uid_val = VarInt().deserialise(f).value
+    def _score_root_attempts(
+        self,
+        schemas: List["Schema"],
+        start: int,
+        uid_val: int,
+        uid_pos: int,
+        known: Dict[int, Obj],
+        total: int | None,
+    ) -> "Tuple[Schema | None, Schema | None] | None":
+        """
+        Makes full root parse attempts with `schemas` in worker processes, if
+        root_workers allows it. Returns the schema _read_root_object would
+        have picked trying them one by one (the first, in order, to reach the
+        end of the buffer, else the one getting furthest) and the schema
+        failing deepest, for when none succeeded; or None to try them here.
+        """
+        if self.root_workers <= 1 or len(schemas) <= 1 or self.raw_object_data is None:
+            return None
+        if self._root_pool is None:
+            tables = SchemaTables(
+                self.classdefs,
+                self.schemas,
+                self.enum_shims,
+                self._class_index_by_name,  # type: ignore[arg-type]
+                self._class_index_by_clid,  # type: ignore[arg-type]
+            )
+            self._root_pool = ProcessPoolExecutor(
+                max_workers=self.root_workers,
+                initializer=_init_root_trial,
+                initargs=(tables, self.shims, self.lazy, self.diagnostics,
+                          self.primitive_arrays, self.raw_object_data),
+            )
+            self._root_pool_uids = 0
+        positions = {id(schema): i for i, schema in enumerate(self.schemas)}
+        # Roots only add to the object table, so workers get the UIDs defined
+        # since the previous root; one that missed a root is sent them all.
+        known_count = len(known)
+        new_uids = list(islice(known, self._root_pool_uids, None))
+        self._root_pool_uids = known_count
+        futures = [
+            self._root_pool.submit(
+                _try_root_schema, positions[id(schema)], start, uid_val, uid_pos, known_count, new_uids
+            )
+            for schema in schemas
+        ]
+        best: Schema | None = None
+        best_pos = -1
+        failed: Schema | None = None
+        failed_pos = -1
+        try:
+            for schema, future in zip(schemas, futures):
+                result = future.result()
+                if result is None:
+                    result = self._root_pool.submit(
+                        _try_root_schema, positions[id(schema)], start, uid_val, uid_pos,
+                        known_count, list(known),
+                    ).result()
+                ok, pos = result  # type: ignore[misc]
+                if not ok:
+                    if pos > failed_pos:
+                        failed, failed_pos = schema, pos
+                elif total is None or pos == total:
+                    return schema, None
+                elif pos > best_pos:
+                    best, best_pos = schema, pos
+        except (BrokenExecutor, OSError, pickle.PicklingError):
+            # Workers unavailable (or tables that don't pickle): fall back.
+            self._root_pool.shutdown(wait=False, cancel_futures=True)
+            self._root_pool = None
+            self.root_workers = 1
+            return None
+        finally:
+            for future in futures:
+                future.cancel()
+        return best, failed
+
+    def _read_ref(self, f: ByteReader, schema: "Schema | None") -> "Obj | Steps | None":
+        """
+        Reads an object reference. If it is the object's first occurrence,
+        returns a step generator reading its definition (see walk) instead.
+        """
+        pos = f.pos
+        uid_val = f.read_varint()
         if uid_val == 0: return None
-        if uid_val in self.objects: return self.objects[uid_val]
-        schema = self._resolve_runtime_schema(f, schema)
-        obj = Obj(schema, self)
+        obj = self.objects.get(uid_val)
+        if obj is None:
+            if self._visitor is not None:
+                return self._visit_definition_steps(f, uid_val, schema)
+            return self._definition_steps(f, uid_val, pos, schema)
+        # Decoding a lazy object's fields: a child defined inline is left
+        # unloaded, so step over its definition.
+        if isinstance(obj, LazyObj) and obj.def_pos == pos:
+            f.seek(obj.end)
+        elif self.index is not None:
+            self.index.add_backref(uid_val)
+        return obj
+
+    def _read_definition(
+        self, f: ByteReader, uid_val: int, def_pos: int, schema: "Schema | None"
+    ) -> Obj:
+        if self._visitor is not None:
+            return walk(self._visit_definition_steps(f, uid_val, schema))
+        return walk(self._definition_steps(f, uid_val, def_pos, schema))
+
+    def _definition_steps(
+        self, f: ByteReader, uid_val: int, def_pos: int, schema: "Schema | None"
+    ) -> Steps:
+        obj = Obj(self._resolve_runtime_schema(f, schema), self)
+        obj.uid = uid_val
         self.objects[uid_val] = obj
-        obj.deserialise(f)
+        read_fields = self._schema_steps_for(obj.schema)
+        index = self.index
+        if index is None:
+            yield from read_fields(self, f, obj._fields)
+        else:
+            entry = index.begin(obj, def_pos, f.pos)
+            yield from read_fields(self, f, obj._fields)
+            index.finish(entry, f.pos)
         return obj
 
+    def _skip_ref(self, f: ByteReader, schema: "Schema | None") -> Steps | None:
+        pos = f.pos
+        uid_val = f.read_varint()
+        if uid_val == 0: return None
+        if uid_val in self.objects:
+            if self.index is not None:
+                self.index.add_backref(uid_val)
+            return None
+        return self._skip_definition_steps(f, uid_val, pos, schema)
+
+    def _skip_definition(
+        self, f: ByteReader, uid_val: int, def_pos: int, schema: "Schema | None"
+    ) -> LazyObj:
+        """Records a LazyObj for the definition at `f` and skips past its fields."""
+        return walk(self._skip_definition_steps(f, uid_val, def_pos, schema))
+
+    def _skip_definition_steps(
+        self, f: ByteReader, uid_val: int, def_pos: int, schema: "Schema | None"
+    ) -> Steps:
+        if self._visitor is not None:
+            ref = ObjectRef(uid_val, self._resolve_runtime_schema(f, schema))
+            self.objects[uid_val] = ref  # type: ignore[assignment]
+            yield from self._schema_skip_steps_for(ref.schema)(self, f)
+            return ref
+        assert self.index is not None
+        obj = LazyObj(self._resolve_runtime_schema(f, schema), self, uid_val, def_pos)
+        obj.start = f.pos
+        self.objects[uid_val] = obj
+        entry = self.index.begin(obj, def_pos, obj.start)
+        yield from self._schema_skip_steps_for(obj.schema)(self, f)
+        obj.end = f.pos
+        self.index.finish(entry, obj.end)
+        return obj
+
+    def _visit_definition_steps(
+        self, f: ByteReader, uid_val: int, schema: "Schema | None"
+    ) -> Steps:
+        """Like _definition_steps, but reports the object to the visitor and keeps only an ObjectRef."""
+        visitor = self._visitor
+        assert visitor is not None
+        ref = ObjectRef(uid_val, self._resolve_runtime_schema(f, schema))
+        self.objects[uid_val] = ref  # type: ignore[assignment]
+        visitor.on_object_start(uid_val, ref.schema)
+        fields: Dict[str, Any] = {}
+        yield from self._schema_steps_for(ref.schema)(self, f, fields)
+        for name, value in fields.items():
+            visitor.on_field(name, value)
+        visitor.on_object_end(uid_val)
+        return ref
+
+    def _load_lazy(self, obj: LazyObj) -> None:
+        assert self._span_data is not None
+        f = ByteReader(self._span_data, obj.start)
+        saved_context = self._read_context
+        self._read_context = []
+        try:
+            walk(self._schema_steps_for(obj.schema)(self, f, obj._fields))  # type: ignore[arg-type]
+        finally:
+            self._read_context = saved_context
+
+    def _skipper_for(self, prop_type: PropType) -> Skipper:
+        """Returns the compiled skipper for `prop_type`, compiling it on first use."""
+        skipper = prop_type._compiled.get("skip")
+        if skipper is None:
+            skipper = prop_type._compiled["skip"] = self._compile_skipper(prop_type)
+        return skipper
+
+    def _skip_steps_for(self, prop_type: PropType) -> SkipperSteps:
+        """Like _steps_for, for skippers: the plain skipper unless `prop_type` can hold references."""
+        if not self._holds_refs(prop_type):
+            return self._skipper_for(prop_type)
+        steps = prop_type._compiled.get("skip/steps")
+        if steps is None:
+            steps = prop_type._compiled["skip/steps"] = self._compile_skip_steps(prop_type)
+        return steps
+
+    def _schema_skip_steps_for(self, schema: "Schema") -> Callable[["HXSFile", ByteReader], Steps]:
+        steps = schema._compiled.get("skip")
+        if steps is None:
+            skippers = tuple(self._skip_steps_for(schema.field_types[i]) for i in range(len(schema.field_names)))
+
+            def skip_fields(ctx: "HXSFile", f: ByteReader) -> Steps:
+                for skip in skippers:
+                    nested = skip(ctx, f)
+                    if nested is not None:
+                        yield nested
+            steps = schema._compiled["skip"] = skip_fields
+        return steps
+
+    def _compile_skipper(self, prop_type: PropType) -> Skipper:
+        """
+        Builds a closure that steps over a value of `prop_type` without
+        building it. It validates what the decoder would (string encoding,
+        unknown CLIDs, unsupported kinds) so lazy root detection behaves the
+        same as an eager parse.
+        """
+        if prop_type.kind is None:
+            return lambda ctx, f: None
+        if self._holds_refs(prop_type):
+            steps = self._skip_steps_for(prop_type)
+
+            def skip_complete(ctx: "HXSFile", f: ByteReader) -> None:
+                nested = steps(ctx, f)
+                if nested is not None:
+                    walk(nested)
+            return skip_complete
+        kind, defn = prop_type.kind.kind, prop_type.defn
+        K = PropTypeDesc.Kind
+
+        def fixed(size: int) -> Skipper:
+            def skip(ctx: "HXSFile", f: ByteReader) -> None:
+                f.advance(size, kind.name)
+            return skip
+
+        def consume(read: Callable[[ByteReader], Any]) -> Skipper:
+            def skip(ctx: "HXSFile", f: ByteReader) -> None:
+                read(f)
+            return skip
+
+        if kind in (K.PInt, K.PFlags):
+            return consume(ByteReader.read_varint)
+        if kind == K.PFloat:
+            return fixed(4)
+        if kind == K.PBool:
+            return fixed(1)
+        if kind == K.PInt64:
+            return fixed(8)
+        if kind == K.PString:
+            return consume(ByteReader.read_string)
+        if kind == K.PBytes:
+            def skip_bytes(ctx: "HXSFile", f: ByteReader) -> None:
+                length = f.read_varint()
+                if length != 0:
+                    f.advance(length - 1, "Bytes")
+            return skip_bytes
+        if kind in (K.PArray, K.PVector) and isinstance(defn, TypeDef):
+            item_kind = defn.type.kind.kind if defn.type.kind else None
+            if item_kind in (K.PInt, K.PFloat, K.PBool):
+                read = {
+                    K.PInt: ByteReader.read_varints,
+                    K.PFloat: lambda f, n: f.advance(4 * n, "Float array"),
+                    K.PBool: lambda f, n: f.advance(n, "Bool array"),
+                }[item_kind]
+
+                def skip_primitive_array(ctx: "HXSFile", f: ByteReader) -> None:
+                    count = f.read_varint()
+                    if count > 0:
+                        read(f, count - 1)
+                return skip_primitive_array
+            item_skipper = self._skipper_for(defn.type)
+
+            def skip_array(ctx: "HXSFile", f: ByteReader) -> None:
+                for _ in range(f.read_varint() - 1):
+                    item_skipper(ctx, f)
+            return skip_array
+        if kind == K.PMap and isinstance(defn, MapDef):
+            key_skipper = self._skipper_for(defn.key_type)
+            value_skipper = self._skipper_for(defn.value_type)
+
+            def skip_map(ctx: "HXSFile", f: ByteReader) -> None:
+                for _ in range(f.read_varint() - 1):
+                    key_skipper(ctx, f)
+                    value_skipper(ctx, f)
+            return skip_map
+        if kind == K.PEnum and isinstance(defn, NameDef):
+            ctors = (self.enum_shims.get(defn.name.value) if defn.name.value else None) or []
+            arg_skippers = [
+                tuple(
+                    self._skipper_for(self._create_proptype_from_shim(arg_shim))
+                    for arg_shim in ctor["args"]
+                )
+                for ctor in ctors
+            ]
+
+            def skip_enum(ctx: "HXSFile", f: ByteReader) -> None:
+                index = f.read_byte() - 1
+                if 0 <= index < len(arg_skippers):
+                    for skip in arg_skippers[index]:
+                        skip(ctx, f)
+            return skip_enum
+        if kind == K.PNull and isinstance(defn, TypeDef):
+            inner = self._skipper_for(defn.type)
+
+            def skip_null(ctx: "HXSFile", f: ByteReader) -> None:
+                if f.read_byte() != 0:
+                    inner(ctx, f)
+            return skip_null
+        if kind in (K.PAlias, K.PAliasCDB, K.PNoSave) and isinstance(defn, TypeDef):
+            return self._skipper_for(defn.type)
+        if kind == K.PObj and isinstance(defn, ObjDef):
+            layout = self._obj_layout(defn)
+            fields: Tuple[Tuple[int | None, Skipper], ...] = tuple(
+                (bit, self._skipper_for(field_type) if field_type else consume(ByteReader.read_string))
+                for bit, field_type in zip(layout.bits, layout.types)
+            )
+
+            def skip_obj(ctx: "HXSFile", f: ByteReader) -> None:
+                bits = f.read_varint()
+                if bits == 0: return
+                bits -= 1
+                for bit, skip in fields:
+                    if bit is None or bits & bit:
+                        skip(ctx, f)
+            return skip_obj
+
+        def unsupported(ctx: "HXSFile", f: ByteReader) -> None:
+            raise NotImplementedError(f"Deserialization for {kind.name} is not implemented.")
+        return unsupported
+
+    def _compile_skip_steps(self, prop_type: PropType) -> SkipperSteps:
+        """
+        Builds the step skipper for a type that can hold references, mirroring
+        _compile_skipper the way _compile_steps mirrors _compile_reader: it
+        returns a step generator to run when there are definitions to skip.
+        """
+        assert prop_type.kind is not None
+        kind, defn = prop_type.kind.kind, prop_type.defn
+        K = PropTypeDesc.Kind
+
+        if kind in (K.PSerializable, K.PSerInterface):
+            schema = (
+                self._get_schema_by_name(defn.name.value)
+                if kind == K.PSerializable and isinstance(defn, NameDef)
+                else None
+            )
+            return lambda ctx, f: ctx._skip_ref(f, schema)
+        if kind in (K.PAlias, K.PAliasCDB, K.PNoSave) and isinstance(defn, TypeDef):
+            return self._skip_steps_for(defn.type)
+        if kind == K.PNull and isinstance(defn, TypeDef):
+            inner = self._skip_steps_for(defn.type)
+            return lambda ctx, f: inner(ctx, f) if f.read_byte() != 0 else None
+        if kind in (K.PArray, K.PVector) and isinstance(defn, TypeDef):
+            item_skipper = self._skip_steps_for(defn.type)
+
+            def skip_array(ctx: "HXSFile", f: ByteReader) -> Steps:
+                for _ in range(f.read_varint() - 1):
+                    nested = item_skipper(ctx, f)
+                    if nested is not None:
+                        yield nested
+            return skip_array
+        if kind == K.PMap and isinstance(defn, MapDef):
+            key_skipper = self._skip_steps_for(defn.key_type)
+            value_skipper = self._skip_steps_for(defn.value_type)
+
+            def skip_map(ctx: "HXSFile", f: ByteReader) -> Steps:
+                for _ in range(f.read_varint() - 1):
+                    nested = key_skipper(ctx, f)
+                    if nested is not None:
+                        yield nested
+                    nested = value_skipper(ctx, f)
+                    if nested is not None:
+                        yield nested
+            return skip_map
+        if kind == K.PEnum and isinstance(defn, NameDef):
+            ctors = (self.enum_shims.get(defn.name.value) if defn.name.value else None) or []
+            arg_skippers = [
+                tuple(
+                    self._skip_steps_for(self._create_proptype_from_shim(arg_shim))
+                    for arg_shim in ctor["args"]
+                )
+                for ctor in ctors
+            ]
+
+            def skip_enum(ctx: "HXSFile", f: ByteReader) -> Steps:
+                index = f.read_byte() - 1
+                if 0 <= index < len(arg_skippers):
+                    for skip in arg_skippers[index]:
+                        nested = skip(ctx, f)
+                        if nested is not None:
+                            yield nested
+            return skip_enum
+        if kind == K.PObj and isinstance(defn, ObjDef):
+            def skip_string(ctx: "HXSFile", f: ByteReader) -> None:
+                f.read_string()  # the untyped string hack
+
+            layout = self._obj_layout(defn)
+            fields: Tuple[Tuple[int | None, SkipperSteps], ...] = tuple(
+                (bit, self._skip_steps_for(field_type) if field_type else skip_string)
+                for bit, field_type in zip(layout.bits, layout.types)
+            )
+
+            def skip_obj(ctx: "HXSFile", f: ByteReader) -> Steps:
+                bits = f.read_varint()
+                if bits == 0: return
+                bits -= 1
+                for bit, skip in fields:
+                    if bit is None or bits & bit:
+                        nested = skip(ctx, f)
+                        if nested is not None:
+                            yield nested
+            return skip_obj
+        if kind == K.PDynamic:
+            return lambda ctx, f: ctx._skip_dynamic(f)
+        return self._compile_skipper(prop_type)
+
     def _write_value(self, prop_type: PropType, value: Any) -> None:
         """Writes a single typed Python value to the buffer."""
-        if prop_type.kind is None: return
+        steps = self._write_steps(prop_type, value)
+        if steps is not None:
+            walk(steps)
+
+    def _write_steps(self, prop_type: PropType, value: Any) -> Steps | None:
+        """
+        Writes `value` to the buffer, except that if it holds objects whose
+        fields have to be written, what remains is returned as a step
+        generator (see walk) for the caller to run next.
+        """
+        if prop_type.kind is None: return None
         kind, defn = prop_type.kind.kind, prop_type.defn
+        out = self.buffer
         
         if kind in [PropTypeDesc.Kind.PInt, PropTypeDesc.Kind.PFlags]:
-            self.buffer.write(VarInt(value).serialise())
+            out.write_varint(value)
         elif kind == PropTypeDesc.Kind.PFloat:
-            self.buffer.write(struct.pack("<f", value))
+            out.write_f32(value)
         elif kind == PropTypeDesc.Kind.PBool:
-            self.buffer.write(bytes([1 if value else 0]))
+            out.write_byte(1 if value else 0)
         elif kind == PropTypeDesc.Kind.PInt64:
-            self.buffer.write(struct.pack("<q", value))
+            out.write_i64(value)
         elif kind == PropTypeDesc.Kind.PString:
-            self.buffer.write(String(value).serialise())
+            out.write_string(value)
         elif kind == PropTypeDesc.Kind.PBytes:
-            if value is None:
-                self.buffer.write(VarInt(0).serialise())
-            else:
-                self.buffer.write(VarInt(len(value) + 1).serialise())
-                self.buffer.write(value)
+            out.write_bytes(value)
         
         elif kind in [PropTypeDesc.Kind.PArray, PropTypeDesc.Kind.PVector] and isinstance(defn, TypeDef):
             if value is None:
-                self.buffer.write(VarInt(0).serialise())
+                out.write_byte(0)
             else:
-                self.buffer.write(VarInt(len(value) + 1).serialise())
-                for item in value:
-                    self._write_value(defn.type, item)
+                out.write_varint(len(value) + 1)
+                item_kind = defn.type.kind.kind if defn.type.kind else None
+                if item_kind == PropTypeDesc.Kind.PInt:
+                    out.write_varints(value)
+                elif item_kind == PropTypeDesc.Kind.PFloat:
+                    out.write_f32s(value)
+                elif item_kind == PropTypeDesc.Kind.PBool:
+                    out.write_bools(value)
+                else:
+                    return self._write_all_steps((defn.type, item) for item in value)
         
         elif kind == PropTypeDesc.Kind.PMap and isinstance(defn, MapDef):
             if value is None:
-                self.buffer.write(VarInt(0).serialise())
+                out.write_byte(0)
             else:
-                self.buffer.write(VarInt(len(value) + 1).serialise())
-                for k, v in value.items():
-                    self._write_value(defn.key_type, k)
-                    self._write_value(defn.value_type, v)
+                out.write_varint(len(value) + 1)
+                return self._write_all_steps(
+                    part
+                    for k, v in value.items()
+                    for part in ((defn.key_type, k), (defn.value_type, v))
+                )
         
         elif kind == PropTypeDesc.Kind.PSerializable and isinstance(defn, NameDef):
-            self._write_ref(value, self._get_schema_by_name(defn.name.value))
+            obj = self._begin_ref(value, self._get_schema_by_name(defn.name.value))
+            if obj is not None:
+                return self._fields_write_steps(obj)
 
         elif kind == PropTypeDesc.Kind.PSerInterface:
-            self._write_ref(value, None)
+            obj = self._begin_ref(value, None)
+            if obj is not None:
+                return self._fields_write_steps(obj)
 
         elif kind == PropTypeDesc.Kind.PObj and isinstance(defn, ObjDef):
             if value is None:
-                self.buffer.write(VarInt(0).serialise())
+                out.write_byte(0)
             else:
-                bits, bit_idx = 0, 0
-                for field_def in defn.fields:
-                    if self._is_field_nullable(field_def.type):
-                        field_name = field_def.name.value if field_def.name else f"<unnamed_{bit_idx}>"
-                        if value.get(field_name) is not None:
-                            bits |= (1 << bit_idx)
-                        bit_idx += 1
-                self.buffer.write(VarInt(bits + 1).serialise())
-                
-                bit_idx = 0
-                for field_def in defn.fields:
-                    field_name = field_def.name.value if field_def.name else f"<unnamed_{bit_idx}>"
+                layout = self._obj_layout(defn)
+                bits = 0
+                parts: List[Tuple[PropType | None, Any]] = []
+                for field_name, bit, field_type in zip(layout.names, layout.bits, layout.types):
                     field_value = value.get(field_name)
-                    
-                    is_present = True
-                    if self._is_field_nullable(field_def.type):
-                        is_present = (bits & (1 << bit_idx)) != 0
-                        bit_idx += 1
-                    
-                    if is_present:
-                        if field_def.type:
-                            self._write_value(field_def.type, field_value)
-                        else: # The untyped string hack
-                            self.buffer.write(String(field_value).serialise())
+                    if bit is not None:
+                        if field_value is None:
+                            continue
+                        bits |= bit
+                    # No type means the untyped string hack
+                    parts.append((field_type, field_value))
+                out.write_varint(bits + 1)
+                return self._write_all_steps(parts)
 
         elif kind == PropTypeDesc.Kind.PEnum:
             if value is None:
-                self.buffer.write(b'\x00')
+                out.write_byte(0)
             elif isinstance(value, dict) and "__enum__" in value:
-                self.buffer.write(bytes([value["constructor"] + 1]))
+                out.write_byte(value["constructor"] + 1)
                 ctors = self.enum_shims.get(value["__enum__"]) or []
                 ctor = ctors[value["constructor"]]
-                for arg_shim, arg_value in zip(ctor["args"], value["args"]):
-                    self._write_value(self._create_proptype_from_shim(arg_shim), arg_value)
+                return self._write_all_steps(
+                    (self._create_proptype_from_shim(arg_shim), arg_value)
+                    for arg_shim, arg_value in zip(ctor["args"], value["args"])
+                )
             elif isinstance(value, str) and value.endswith(')'):
                 # "Enum<Name>(123)" — stored index is constructor + 1
                 num_str = value.split('(')[-1][:-1]
-                self.buffer.write(bytes([int(num_str) + 1]))
-            else: # Fallback for unknown enum format
-                print("WARNING: enum fallback format")
-                self.buffer.write(VarInt(0).serialise())
+                out.write_byte(int(num_str) + 1)
+            else:
+                warnings.warn(
+                    f"Unrecognised enum value {value!r}; writing it as null.",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+                out.write_byte(0)
                 
         elif kind == PropTypeDesc.Kind.PNull and isinstance(defn, TypeDef):
             if value is None:
-                self.buffer.write(b'\x00')
+                out.write_byte(0)
             else:
-                self.buffer.write(b'\x01')
-                self._write_value(defn.type, value)
+                out.write_byte(1)
+                return self._write_steps(defn.type, value)
+
+        elif kind == PropTypeDesc.Kind.PDynamic:
+            return self._write_dynamic(value)
 
         else:
             raise NotImplementedError(f"Serialization for {kind.name} is not implemented.")
+        return None
+
+    def _write_all_steps(self, parts: Iterable[Tuple[PropType | None, Any]]) -> Steps:
+        """Writes each (type, value) of `parts` in order, a type of None being a bare string."""
+        out = self.buffer
+        for prop_type, value in parts:
+            if prop_type is None:
+                out.write_string(value)
+                continue
+            nested = self._write_steps(prop_type, value)
+            if nested is not None:
+                yield nested
+
+    def _fields_write_steps(self, obj: Obj) -> Steps:
+        """Writes the fields of `obj` according to its schema."""
+        schema = obj.schema
+        if not schema:
+            return
+        fields = obj.fields
+        for field_name, field_type in zip(schema.field_names, schema.field_types):
+            assert field_name.value is not None
+            nested = self._write_steps(field_type, fields.get(field_name.value))
+            if nested is not None:
+                yield nested
 
     def _write_ref(self, obj: Obj | None, declared_schema: "Schema | None" = None) -> None:
-        """Writes an object reference.
+        """Writes an object reference, and the object's fields if this is its first occurrence."""
+        obj = self._begin_ref(obj, declared_schema)
+        if obj is not None:
+            walk(self._fields_write_steps(obj))
+
+    def _begin_ref(self, obj: Obj | None, declared_schema: "Schema | None") -> Obj | None:
+        """
+        Writes an object reference. If it is the object's first occurrence and
+        its fields can't be copied verbatim, returns it: they have to be
+        written next.
         """
         if obj is None:
-            self.buffer.write(VarInt(0).serialise())
-            return
+            self.buffer.write_byte(0)
+            return None
 
         obj_id = id(obj)
         if obj_id in self.written_objects:
             uid = self.written_objects[obj_id]
-            self.buffer.write(VarInt(uid).serialise())
-            return
+            self.buffer.write_varint(uid)
+            return None
 
-        new_uid = self.next_uid
-        self.next_uid += 1
+        # Objects keep the UID they were read with, so byte ranges copied
+        # verbatim from the original payload stay consistent.
+        if obj.uid is not None and obj.uid not in self.written_uids:
+            new_uid = obj.uid
+        else:
+            new_uid = self.next_uid
+            self.next_uid += 1
 
         self.written_objects[obj_id] = new_uid
-        self.buffer.write(VarInt(new_uid).serialise())
+        self.written_uids.add(new_uid)
+        self.buffer.write_varint(new_uid)
 
         if declared_schema is None or declared_schema.clid.value == 0:
             class_name = (
@@ -1620,56 +4203,471 @@ class HXSFile(Serialisable):
                 raise ValueError(
                     "Cannot write a polymorphic reference to an object with no class name."
                 )
-            self.buffer.write(struct.pack(">H", self.clid_hash(class_name)))
+            self.buffer.write_u16_be(self.clid_hash(class_name))
 
-        obj.serialise()
+        if self._write_verbatim(obj):
+            return None
+        return obj
+
+    def _is_pristine(self, obj: Obj) -> bool:
+        """Whether `obj` still holds exactly what was read for it."""
+        if obj.dirty:
+            return False
+        if isinstance(obj, LazyObj) and not obj.loaded:
+            return True
+        # Loaded objects are only trusted on an incremental save: a full
+        # re-encode (raw_object_data cleared) also has to pick up edits made
+        # inside nested containers, which dirty tracking can't see.
+        return self._splice_clean
+
+    def _write_verbatim(self, obj: Obj) -> bool:
+        """
+        Copies an unedited object's field bytes straight from the original
+        payload. This is only valid if neither it nor any object defined
+        inside it has been edited or written already, and every object they
+        refer back to has already been written.
+        """
+        index = self.index
+        if index is None or self._span_data is None or not self._is_pristine(obj):
+            return False
+        try:
+            entry = index.entry_of(obj)
+        except KeyError:
+            return False  # created after parsing
+        entries = index.subtree(entry)
+        members: List[Obj] = []
+        for i in entries[1:]:
+            member = index.objects[i]
+            if (
+                not self._is_pristine(member)
+                or id(member) in self.written_objects
+                or member.uid in self.written_uids
+            ):
+                return False
+            members.append(member)
+        start, end = index.starts[entry], index.ends[entry]
+        for i in entries:
+            for uid in index.backrefs.get(i, ()):
+                target = self.objects.get(uid)
+                if target is None:
+                    return False
+                if id(target) in self.written_objects:
+                    continue
+                target_entry = index._by_uid.get(uid)
+                if target_entry is None or not start <= index.starts[target_entry] < end:
+                    return False
+        self.buffer.write(memoryview(self._span_data)[index.data_starts[entry]:end])
+        for member in members:
+            self.written_objects[id(member)] = member.uid  # type: ignore[assignment]
+            self.written_uids.add(member.uid)  # type: ignore[arg-type]
+        return True
 
     def serialise(self) -> bytes:
+        buf = bytearray()
+        self.serialise_into(buf)
+        return bytes(buf)
+
+    def serialise_into(self, buf: bytearray) -> None:
+        """
+        Appends the encoded file to `buf`. The header, schemas and objects are
+        all written straight into it, so the only large copies are the
+        verbatim payload bytes (and the caller's own, if it needs `bytes`).
+        """
+        out = ByteWriter(buf)
+        out.write(self.magic.serialise())
+        out.write(self.version.serialise())
+
+        # Write class definitions
+        for cdef in self.classdefs:
+            out.write(cdef.serialise())
+        out.write_string(None)  # End of class defs marker
+
+        # Write schema definitions, then put their total size in front of them
+        schemas_start = len(buf)
+        for schema in self.schemas:
+            out.write(schema.serialise())
+        self.schema_size.value = len(buf) - schemas_start
+        buf[schemas_start:schemas_start] = self.schema_size.serialise()
+
         # Re-initialize serialization state
-        self.buffer = BytesIO()
+        self.buffer = out
         self.written_objects = {}
-        self.next_uid = 1
-
-        # Write the object data first to a temporary buffer, unless we had to
-        # preserve an opaque payload because typed deserialization failed.
-        if self.raw_object_data is not None:
-            object_data = self.raw_object_data
+        self.written_uids = set()
+        self.next_uid = max(self.objects, default=0) + 1
+
+        # Write the object data. The original payload is reused as-is if
+        # nothing was edited, or if typed deserialization failed and it has to
+        # be preserved opaquely. With edits, only dirty objects are re-encoded
+        # and everything else is spliced in from the original bytes; UIDs are
+        # kept, so nothing around a re-encoded object needs fixing up.
+        # Clearing raw_object_data forces a full re-encode of every loaded
+        # object.
+        if self.raw_object_data is not None and (
+            self.object_parse_error is not None or not self.dirty_objects
+        ):
+            out.write(self.raw_object_data)
         else:
+            self._splice_clean = self.raw_object_data is not None
             for root in (self.roots or ([self.obj] if self.obj else [])):
                 self._write_ref(root, root.schema)
-            object_data = self.buffer.getvalue()
-        
-        # Now, build the final file with the header and object data
-        final_buffer = BytesIO()
-        final_buffer.write(self.magic.serialise())
-        final_buffer.write(self.version.serialise())
-        
-        # Write class definitions
-        for cdef in self.classdefs:
-            final_buffer.write(cdef.serialise())
-        final_buffer.write(String(None).serialise()) # End of class defs marker
-
-        # Write schema definitions
-        schema_bytes = b"".join(s.serialise() for s in self.schemas)
-        self.schema_size.value = len(schema_bytes)
-        final_buffer.write(self.schema_size.serialise())
-        final_buffer.write(schema_bytes)
-        
-        # Write the main object data
-        final_buffer.write(object_data)
+        self.buffer = ByteWriter()
 
-        return final_buffer.getvalue()
+    def objects_by_class(self, name: str | None = None) -> List[Obj]:
+        """
+        The parsed objects of class `name`, given as its full name or its last
+        component ("User" for "game.User"), or all of them for None. Served
+        from a per-file index built on first use, so repeated lookups don't
+        walk the graph (and in lazy mode decode nothing).
+        """
+        if name is None:
+            return list(self.objects.values())
+        key = (id(self.objects), len(self.objects))
+        index = self._class_objects
+        if index is None or self._class_objects_key != key:
+            index = {}
+            for obj in self.objects.values():
+                classdef = obj.schema.classdef if obj.schema else None
+                if classdef is None or classdef.name.value is None:
+                    continue
+                full = classdef.name.value
+                index.setdefault(full, []).append(obj)
+                short = full.rsplit(".", 1)[-1]
+                if short != full:
+                    index.setdefault(short, []).append(obj)
+            self._class_objects = index
+            self._class_objects_key = key
+        return index.get(name, [])
+
+    def select(self, selector: str) -> Iterator[Any]:
+        """Yields the values matching `selector` (see hxbit.query), lazily."""
+        from .query import compile_selector
+
+        return compile_selector(selector).select(self)
+
+    def root_uids(self) -> List[int]:
+        """UIDs of the root objects, as used by iter_json_records()."""
+        return [self._json_uid(root) for root in (self.roots or ([self.obj] if self.obj else []))]
+
+    def iter_json_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields one JSON-ready record per object reachable from the roots,
+        {"uid": ..., "class": ..., "fields": {...}}, each object once and in
+        the order serialise() defines them. References to other objects are
+        written as {"$ref": uid} (see _json_value), so shared and cyclic
+        structures stay linear in size. Objects are visited on an explicit
+        stack, and each record is built only when it is asked for.
+        """
+        pending = list(reversed(self.roots or ([self.obj] if self.obj else [])))
+        done: Set[int] = set()
+        while pending:
+            obj = pending.pop()
+            if id(obj) in done:
+                continue
+            done.add(id(obj))
+            refs: List[Obj] = []
+            fields = {name: self._json_value(value, refs) for name, value in obj.fields.items()}
+            yield {
+                "uid": self._json_uid(obj),
+                "class": obj.schema.classdef.name.value if obj.schema and obj.schema.classdef else None,
+                "fields": fields,
+            }
+            # Depth first, in field order: the objects an object refers to
+            # are defined right after it, before its later siblings.
+            pending.extend(reversed(refs))
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        The object graph as one JSON-ready document, {"roots": [uid, ...],
+        "objects": {"<uid>": {"class": ..., "fields": {...}}}}. See
+        iter_json_records() to produce it one object at a time.
+        """
+        objects = {
+            str(record["uid"]): {"class": record["class"], "fields": record["fields"]}
+            for record in self.iter_json_records()
+        }
+        return {"roots": self.root_uids(), "objects": objects}
+
+    def _json_uid(self, obj: Obj) -> int:
+        """The UID `obj` is exported as. Objects created after parsing are given one for good."""
+        if obj.uid is None:
+            obj.uid = max(self.objects, default=0) + 1
+            self.objects[obj.uid] = obj
+        return obj.uid
+
+    def _json_value(self, value: Any, refs: List[Obj]) -> Any:
+        """
+        Converts a field value to plain JSON data. Objects become
+        {"$ref": uid} and are appended to `refs`, bytes become
+        {"$bytes": "<base64>"}, dynamic enums {"$enum": [name, constructor]},
+        NaN and infinite floats {"$float": "nan"} (or "inf", "-inf"), which
+        strict JSON has no literal for, and maps with keys that aren't strings
+        become {"$map": [[key, value], ...]}. The schema tells how to read
+        each back.
+        """
+        if isinstance(value, Obj):
+            refs.append(value)
+            return {"$ref": self._json_uid(value)}
+        if isinstance(value, DynamicEnum):
+            return {"$enum": list(value)}
+        if isinstance(value, float):
+            return value if math.isfinite(value) else {"$float": repr(value)}
+        if value is None or isinstance(value, (bool, int, str)):
+            return value
+        if isinstance(value, (bytes, bytearray)):
+            return {"$bytes": base64.b64encode(value).decode("ascii")}
+        if isinstance(value, dict):
+            if all(isinstance(key, str) for key in value):
+                return {key: self._json_value(item, refs) for key, item in value.items()}
+            return {
+                "$map": [
+                    [self._json_value(key, refs), self._json_value(item, refs)]
+                    for key, item in value.items()
+                ]
+            }
+        if isinstance(value, array) or (numpy is not None and isinstance(value, numpy.ndarray)):
+            items = value.tolist()
+            if items and type(items[0]) is float:
+                return [item if math.isfinite(item) else {"$float": repr(item)} for item in items]
+            return items
+        return [self._json_value(item, refs) for item in value]
+
+    def load_json(self, document: Dict[str, Any]) -> None:
+        """Replaces the object graph with the one in `document`, as produced by to_json()."""
+        self.load_json_records(
+            document["roots"],
+            (
+                {"uid": int(uid), "class": record["class"], "fields": record["fields"]}
+                for uid, record in document["objects"].items()
+            ),
+        )
+
+    def load_json_records(self, roots: List[int], records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Replaces the object graph with one rebuilt from `records`, as produced
+        by iter_json_records(), using this file's schemas to turn the JSON
+        data back into field values. Objects keep their UIDs, so an unedited
+        export re-serialises to the same bytes. The original payload is
+        dropped and serialise() re-encodes everything.
+        """
+        objects: Dict[int, Obj] = {}
+        pending: List[Tuple[Obj, Dict[str, Any]]] = []
+        for record in records:
+            uid = record["uid"]
+            schema = self._get_schema_by_name(record["class"])
+            if schema is None:
+                raise ValueError(f"Object {uid} has unknown class {record['class']!r}.")
+            if uid in objects:
+                raise ValueError(f"Object UID {uid} is defined twice.")
+            obj = Obj(schema, self)
+            obj.uid = uid
+            objects[uid] = obj
+            pending.append((obj, record["fields"]))
+
+        # Fields are converted once every object exists, so references can
+        # point anywhere in the document.
+        for obj, data in pending:
+            fields: Dict[str, Any] = {}
+            for field_name, field_type in zip(obj.schema.field_names, obj.schema.field_types):
+                name = field_name.value
+                assert name is not None
+                if name not in data:
+                    raise ValueError(
+                        f"Object {obj.uid} ({obj.schema.classdef.name.value if obj.schema.classdef else '?'}) "
+                        f"has no field {name!r}."
+                    )
+                fields[name] = self._value_from_json(field_type, data[name], objects)
+            dict.update(obj._fields, fields)
+
+        try:
+            self.roots = [objects[uid] for uid in roots]
+        except KeyError as e:
+            raise ValueError(f"Root object {e.args[0]} is not defined.") from None
+        self.obj = self.roots[0] if self.roots else None
+        self.objects = objects
+        self.raw_object_data = None
+        self.object_parse_error = None
+        self.object_parse_path = None
+        self.index = None
+        self._span_data = None
+        self.dirty_objects = set()
+        self._class_objects = None
+
+    def _value_from_json(self, prop_type: PropType | None, data: Any, objects: Dict[int, Obj]) -> Any:
+        """The inverse of _json_value for a value of `prop_type`; references are looked up in `objects`."""
+        if prop_type is None or prop_type.kind is None or data is None:
+            return data
+        kind, defn = prop_type.kind.kind, prop_type.defn
+        K = PropTypeDesc.Kind
+
+        if kind in (K.PInt, K.PFlags, K.PInt64):
+            return int(data)
+        if kind == K.PFloat:
+            return float(data["$float"] if isinstance(data, dict) else data)
+        if kind == K.PBool:
+            return bool(data)
+        if kind == K.PBytes:
+            return base64.b64decode(data["$bytes"])
+        if kind in (K.PSerializable, K.PSerInterface):
+            uid = data["$ref"]
+            obj = objects.get(uid)
+            if obj is None:
+                raise ValueError(f"Reference to undefined object {uid}.")
+            return obj
+        if kind in (K.PArray, K.PVector) and isinstance(defn, TypeDef):
+            return [self._value_from_json(defn.type, item, objects) for item in data]
+        if kind == K.PMap and isinstance(defn, MapDef):
+            key_kind = defn.key_type.kind.kind if defn.key_type.kind else None
+            if key_kind != K.PString and list(data) == ["$map"]:
+                pairs = data["$map"]
+            else:
+                pairs = data.items()
+            return {
+                self._value_from_json(defn.key_type, key, objects): self._value_from_json(defn.value_type, item, objects)
+                for key, item in pairs
+            }
+        if kind == K.PNull and isinstance(defn, TypeDef):
+            return self._value_from_json(defn.type, data, objects)
+        if kind in (K.PAlias, K.PAliasCDB, K.PNoSave) and isinstance(defn, TypeDef):
+            return self._value_from_json(defn.type, data, objects)
+        if kind == K.PObj and isinstance(defn, ObjDef):
+            layout = self._obj_layout(defn)
+            return {
+                field_name: self._value_from_json(field_type, data[field_name], objects)
+                for field_name, field_type in zip(layout.names, layout.types)
+                if field_name in data
+            }
+        if kind == K.PEnum and isinstance(data, dict) and "__enum__" in data:
+            ctors = self.enum_shims.get(data["__enum__"]) or []
+            arg_shims = ctors[data["constructor"]]["args"]
+            return {
+                **data,
+                "args": [
+                    self._value_from_json(self._create_proptype_from_shim(arg_shim), arg, objects)
+                    for arg_shim, arg in zip(arg_shims, data["args"])
+                ],
+            }
+        if kind == K.PDynamic:
+            return self._dynamic_from_json(data, objects)
+        return data
+
+    def _dynamic_from_json(self, data: Any, objects: Dict[int, Obj]) -> Any:
+        """The inverse of _json_value for a PDynamic value, where only the markers say what's what."""
+        if isinstance(data, dict):
+            if list(data) == ["$ref"]:
+                obj = objects.get(data["$ref"])
+                if obj is None:
+                    raise ValueError(f"Reference to undefined object {data['$ref']}.")
+                return obj
+            if list(data) == ["$bytes"]:
+                return base64.b64decode(data["$bytes"])
+            if list(data) == ["$enum"]:
+                return DynamicEnum(*data["$enum"])
+            if list(data) == ["$float"]:
+                return float(data["$float"])
+            return {key: self._dynamic_from_json(item, objects) for key, item in data.items()}
+        if isinstance(data, list):
+            return [self._dynamic_from_json(item, objects) for item in data]
+        return data
 
     @classmethod
-    def from_path(cls, path: str, shims: str | None = None) -> "HXSFile":
+    def from_path(
+        cls,
+        path: str,
+        shims: str | None = None,
+        root_hints: RootSchemaHints | None = None,
+        lazy: bool = False,
+        index: bool = False,
+        diagnostics: Diagnostics | None = None,
+        primitive_arrays: PrimitiveArrays = "list",
+        schema_cache: SchemaTableCache | None = None,
+        root_workers: int = 1,
+    ) -> "HXSFile":
         with open(path, "rb") as f:
-            instance = cls(shims=shims).deserialise(f)
+            instance = cls(
+                shims=shims,
+                root_hints=root_hints,
+                lazy=lazy,
+                index=index,
+                diagnostics=diagnostics,
+                primitive_arrays=primitive_arrays,
+                schema_cache=schema_cache,
+                root_workers=root_workers,
+            ).deserialise(f)
         return instance
 
     @classmethod
-    def from_bytes(cls, data: bytes, shims: str | None = None) -> "HXSFile":
-        with BytesIO(data) as f:
-            instance = cls(shims=shims).deserialise(f)
+    def from_bytes(
+        cls,
+        data: bytes,
+        shims: str | None = None,
+        root_hints: RootSchemaHints | None = None,
+        lazy: bool = False,
+        index: bool = False,
+        diagnostics: Diagnostics | None = None,
+        primitive_arrays: PrimitiveArrays = "list",
+        schema_cache: SchemaTableCache | None = None,
+        root_workers: int = 1,
+    ) -> "HXSFile":
+        """
+        Parses an HXS file from `data`. With `lazy=True`, objects are only
+        located on the first pass; each one's fields are decoded when first
+        accessed, and objects that were never loaded are re-emitted from their
+        original bytes when the file is serialised. With `index=True` (implied
+        by `lazy`), the byte span of every object is recorded; see `span_of`
+        and `object_at`. `diagnostics` sets how much read-path tracking is
+        done (see Diagnostics), and `primitive_arrays` what arrays of ints,
+        floats and bools decode to (see PrimitiveArrays). Parsed schema
+        tables are reused from `schema_cache`, if given, for files with the
+        same schema header, and root classes are tried in the order of
+        `root_hints`, if given (see RootSchemaHints). With `root_workers`
+        above 1, root schemas that have to be found by trial (see
+        _read_root_object) are tried in that many processes at once.
+        """
+        instance = cls(
+            shims=shims,
+            root_hints=root_hints,
+            lazy=lazy,
+            index=index,
+            diagnostics=diagnostics,
+            primitive_arrays=primitive_arrays,
+            schema_cache=schema_cache,
+            root_workers=root_workers,
+        )
+        return instance.deserialise(ByteReader(data))
+
+    @classmethod
+    def visit(
+        cls,
+        data: bytes,
+        visitor: ObjectVisitor,
+        shims: str | None = None,
+        root_hints: RootSchemaHints | None = None,
+        diagnostics: Diagnostics | None = None,
+        primitive_arrays: PrimitiveArrays = "list",
+        schema_cache: SchemaTableCache | None = None,
+        root_workers: int = 1,
+    ) -> "HXSFile":
+        """
+        Reads the HXS file in `data`, reporting each object to `visitor` (see
+        ObjectVisitor) instead of building the object graph. Only a table of
+        ObjectRefs by UID is kept, to resolve references. Candidate root
+        schemas are tried by skipping over the payload, so the visitor only
+        hears about roots that parse. Returns the file, with its `roots` and
+        `objects` holding ObjectRefs; it can't be serialised. Check
+        `object_parse_error` for whether the whole payload was read.
+        """
+        instance = cls(
+            shims=shims,
+            root_hints=root_hints,
+            diagnostics=diagnostics,
+            primitive_arrays=primitive_arrays,
+            schema_cache=schema_cache,
+            root_workers=root_workers,
+        )
+        instance._visitor = visitor
+        instance.deserialise(ByteReader(data))
+        instance._visitor = None
+        instance.raw_object_data = None
         return instance
 
     def pprint_schemas(self) -> str:
@@ -1695,6 +4693,18 @@ class HXSFile(Serialisable):
                 schema.uid.resolve_schema(self)
             for field_type in schema.field_types:
                 self._resolve_prop_type(field_type)
+        self._index_classes()
+
+    def _index_classes(self) -> None:
+        by_name: Dict[str, int] = {}
+        by_clid: Dict[int, int] = {}
+        for i, class_def in enumerate(self.classdefs):
+            name = class_def.name.value
+            if name is not None:
+                by_name.setdefault(name, i)
+                by_clid.setdefault(self.clid_hash(name), i)
+        self._class_index_by_name = by_name
+        self._class_index_by_clid = by_clid
 
     def _resolve_prop_type(self, prop_type: PropType) -> None:
         if prop_type.defn is None: return
@@ -1718,13 +4728,14 @@ class HXSFile(Serialisable):
         return "\n".join(lines)
 
     def get_class_by_name(self, name: str) -> Tuple[ClassDef, Schema]:
-        for i, class_def in enumerate(self.classdefs):
-            if class_def.name.value == name:
-                if i < len(self.schemas):
-                    return (class_def, self.schemas[i])
-                else:
-                    raise IndexError( f"Found ClassDef for '{name}' at index {i}, but no corresponding Schema exists.")
-        raise ValueError(f"Class with name '{name}' not found.")
+        if self._class_index_by_name is None:
+            self._index_classes()
+        i = self._class_index_by_name.get(name)  # type: ignore[union-attr]
+        if i is None:
+            raise ValueError(f"Class with name '{name}' not found.")
+        if i >= len(self.schemas):
+            raise IndexError( f"Found ClassDef for '{name}' at index {i}, but no corresponding Schema exists.")
+        return (self.classdefs[i], self.schemas[i])
 
     def _get_schema_by_name(self, name: str | None) -> "Schema | None":
         if name is None:
@@ -1742,30 +4753,31 @@ class HXSFile(Serialisable):
     clid_hash = staticmethod(hxbit_hash)
 
     def _get_schema_by_clid(self, clid: int) -> "Schema":
-        for i, class_def in enumerate(self.classdefs):
-            name = class_def.name.value
-            if name is not None and self.clid_hash(name) == clid:
-                return self.schemas[i]
-        raise ValueError(f"Schema with CLID '{clid}' not found.")
+        if self._class_index_by_clid is None:
+            self._index_classes()
+        i = self._class_index_by_clid.get(clid)  # type: ignore[union-attr]
+        if i is None:
+            raise ValueError(f"Schema with CLID '{clid}' not found.")
+        return self.schemas[i]
 
     def _resolve_runtime_schema(
-        self, f: BinaryIO | BytesIO, declared_schema: "Schema | None"
+        self, f: ByteReader, declared_schema: "Schema | None"
     ) -> "Schema":
         if declared_schema is not None and declared_schema.clid.value != 0:
             return declared_schema
 
-        runtime_clid = CLID().deserialise(f)
+        runtime_clid = f.read_u16_be()
         try:
-            return self._get_schema_by_clid(runtime_clid.value)
+            return self._get_schema_by_clid(runtime_clid)
         except ValueError as e:
-            self._record_unresolved_clid(runtime_clid.value, declared_schema, f)
+            self._record_unresolved_clid(runtime_clid, declared_schema, f)
             declared_name = None
             if declared_schema is not None and declared_schema.classdef is not None:
                 declared_name = declared_schema.classdef.name.value
-            path = self._current_read_path()
+            where = f" at {self._current_read_path()}" if self._tracing else ""
             detail = (
-                f"Schema with CLID '{runtime_clid.value}' not found "
-                f"at {path} (declared schema: {declared_name or '<unknown>'}, "
+                f"Schema with CLID '{runtime_clid}' not found"
+                f"{where} (declared schema: {declared_name or '<unknown>'}, "
                 f"offset: 0x{f.tell():x})"
             )
             raise ValueError(detail) from e
@@ -0,0 +1,269 @@
+"""
+Selectors: a small path language for finding values in parsed hxbit files.
+
+    User.stats.*.kills
+    //BossRushData/unlockedGameMode[unlock=true]
+
+A selector starts with a class step. On its own it matches root objects by
+class name, either the full name or its last component ("User" for
+"game.User"). With a leading "//" it matches every object of that class in
+the file instead, found through HXSFile.objects_by_class() rather than a walk
+of the graph. Each following step selects, from every current value, the
+field (or map key, or list index) of that name, or all of them for "*".
+
+Any step can be followed by filters: [field=literal] and [field!=literal]
+keep the values whose field is (not) equal to true, false, null, a number or
+a quoted or bare string; [field] keeps those where the field is set. On a
+step whose value is a list, filters keep the matching elements instead, so
+"unlockedGameMode[unlock=true]" is the same as "unlockedGameMode/*[unlock=true]".
+
+Steps are separated by "." or, if the selector contains a "/" (a leading
+"//" counts), by "/" only, so full class names (which contain dots) can be
+written there: "//game.User" and "game.User/level".
+
+Selectors are compiled once and cached. Evaluation is a chain of lazy
+iterators that only looks into objects of the right class and fields of the
+right name, so taking the first few results decodes little in lazy mode.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Tuple
+
+from .core import HXSFile, Obj, Schema
+
+
+class SelectorError(ValueError):
+    """Raised for a selector that can't be parsed."""
+
+
+class Filter(NamedTuple):
+    field: str
+    op: str  # "=", "!=" or "" (field is set)
+    literal: Any
+
+
+class Step(NamedTuple):
+    name: str | None  # None for "*"
+    filters: Tuple[Filter, ...]
+
+
+_FILTER = re.compile(r"^\s*([^=!<>~\s]+)\s*(?:([=!<>~]+)\s*(.*?))?\s*$")
+_OPERATORS = ("=", "!=")
+_NUMBER = re.compile(r"^-?(?:0x[0-9a-fA-F]+|\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)$")
+_LITERALS = {"true": True, "false": False, "null": None, "None": None}
+
+
+def _parse_literal(text: str) -> Any:
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"":
+        return text[1:-1]
+    if text in _LITERALS:
+        return _LITERALS[text]
+    if _NUMBER.match(text):
+        if text.lower().lstrip("-").startswith("0x"):
+            return int(text, 16)
+        return float(text) if any(c in text for c in ".eE") else int(text)
+    return text
+
+
+def _split(text: str, sep: str) -> List[str]:
+    """Splits `text` on `sep`, except inside [...] filters and their quoted strings."""
+    parts: List[str] = []
+    depth, quote, start = 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif depth and ch in "'\"":
+            quote = ch
+        elif ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    if depth or quote:
+        raise SelectorError(f"Unbalanced brackets or quotes in selector {text!r}.")
+    parts.append(text[start:])
+    return parts
+
+
+def _parse_step(text: str, selector: str) -> Step:
+    bracket = text.find("[")
+    name = (text if bracket < 0 else text[:bracket]).strip()
+    if not name:
+        raise SelectorError(f"Empty step in selector {selector!r}.")
+    filters: List[Filter] = []
+    rest = "" if bracket < 0 else text[bracket:]
+    for body in _split_filters(rest, selector):
+        match = _FILTER.match(body)
+        if match is None:
+            raise SelectorError(f"Invalid filter [{body}] in selector {selector!r}.")
+        field, op, literal = match.groups()
+        if op and op not in _OPERATORS:
+            raise SelectorError(
+                f"Unsupported operator {op!r} in filter [{body}] of selector {selector!r}; use = or !=."
+            )
+        filters.append(Filter(field, op or "", _parse_literal(literal) if op else None))
+    return Step(None if name == "*" else name, tuple(filters))
+
+
+def _split_filters(text: str, selector: str) -> Iterator[str]:
+    depth, quote, start = 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "[":
+            if depth == 0:
+                start = i + 1
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+            if depth == 0:
+                yield text[start:i]
+        elif depth == 0 and not ch.isspace():
+            raise SelectorError(f"Unexpected {ch!r} after a filter in selector {selector!r}.")
+
+
+def _class_matches(obj: Obj, name: str | None) -> bool:
+    if name is None:
+        return True
+    classdef = obj.schema.classdef if obj.schema else None
+    full = classdef.name.value if classdef is not None else None
+    return full is not None and (full == name or full.rsplit(".", 1)[-1] == name)
+
+
+# Field names per schema, by id(schema). The schema is kept with its names so
+# the id can't be reused while the entry exists.
+_field_names: Dict[int, Tuple[Schema, FrozenSet[str]]] = {}
+_FIELD_NAMES_MAX = 4096
+
+
+def _has_field(obj: Obj, name: str) -> bool:
+    """Checks the schema, so objects without the field are skipped without decoding them."""
+    schema = obj.schema
+    if not schema:
+        return False
+    entry = _field_names.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        if len(_field_names) >= _FIELD_NAMES_MAX:
+            _field_names.clear()
+        entry = _field_names[id(schema)] = (
+            schema, frozenset(n.value for n in schema.field_names if n.value is not None)
+        )
+    return name in entry[1]
+
+
+def _is_list(value: Any) -> bool:
+    """Lists, tuples and the array types of primitive_arrays, but not strings or bytes."""
+    return isinstance(value, (list, tuple)) or (
+        hasattr(value, "__len__") and hasattr(value, "__getitem__")
+        and not isinstance(value, (str, bytes, dict, Obj))
+    )
+
+
+def _children(value: Any, name: str | None) -> Iterator[Any]:
+    if isinstance(value, Obj):
+        if name is None:
+            yield from value.fields.values()
+        elif _has_field(value, name):
+            fields = value.fields
+            if name in fields:
+                yield fields[name]
+    elif isinstance(value, dict):
+        if name is None:
+            yield from value.values()
+        elif name in value:
+            yield value[name]
+        elif name.lstrip("-").isdigit() and int(name) in value:
+            yield value[int(name)]
+    elif _is_list(value):
+        if name is None:
+            yield from value
+        elif name.lstrip("-").isdigit():
+            index = int(name)
+            if -len(value) <= index < len(value):
+                yield value[index]
+
+
+def _passes(value: Any, filters: Tuple[Filter, ...]) -> bool:
+    for field, op, literal in filters:
+        found = False
+        for child in _children(value, field):
+            found = True
+            if op == "=" and child != literal:
+                return False
+            if op == "!=" and child == literal:
+                return False
+            if op == "" and child is None:
+                return False
+        if not found and op != "!=":
+            return False
+    return True
+
+
+class Selector:
+    """A compiled selector (see compile_selector)."""
+
+    __slots__ = ("text", "anywhere", "steps")
+
+    def __init__(self, text: str, anywhere: bool, steps: Tuple[Step, ...]) -> None:
+        self.text = text
+        self.anywhere = anywhere  # leading "//": start from every object of the class
+        self.steps = steps
+
+    def __repr__(self) -> str:
+        return f"<Selector {self.text!r}>"
+
+    def select(self, hxs: HXSFile) -> Iterator[Any]:
+        """Yields every value in `hxs` matching the selector, lazily."""
+        first, *rest = self.steps
+        start: Iterable[Obj]
+        if self.anywhere:
+            start = hxs.objects_by_class(first.name)
+        else:
+            start = (
+                root for root in (hxs.roots or ([hxs.obj] if hxs.obj else []))
+                if _class_matches(root, first.name)
+            )
+        values: Iterator[Any] = (obj for obj in start if _passes(obj, first.filters))
+        for step in rest:
+            values = self._apply(step, values)
+        return values
+
+    @staticmethod
+    def _apply(step: Step, values: Iterator[Any]) -> Iterator[Any]:
+        name, filters = step
+        for value in values:
+            for child in _children(value, name):
+                if not filters:
+                    yield child
+                elif _is_list(child):
+                    # Filters on a list apply to its elements.
+                    for item in child:
+                        if _passes(item, filters):
+                            yield item
+                elif _passes(child, filters):
+                    yield child
+
+    def first(self, hxs: HXSFile, default: Any = None) -> Any:
+        """The first match in `hxs`, or `default`."""
+        return next(self.select(hxs), default)
+
+
+@lru_cache(maxsize=256)
+def compile_selector(text: str) -> Selector:
+    """Parses `text` into a Selector. Compiled selectors are cached, so calling this per file is cheap."""
+    body = text.strip()
+    anywhere = body.startswith("//")
+    if anywhere:
+        body = body[2:]
+    parts = _split(body, "/")
+    if not anywhere and len(parts) == 1:
+        parts = _split(body, ".")
+    steps = tuple(_parse_step(part, text) for part in parts)
+    return Selector(text, anywhere, steps)
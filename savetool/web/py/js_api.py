@@ -1,4 +1,5 @@
 import datetime
+import io
 import json
 import reprlib
 import struct
@@ -130,13 +131,15 @@ def _roots(bit: int) -> list[Obj]:
 def _walk(bit: int, path: list):
     """Resolves `path` against the chunk's root list.
 
-    Returns (container, key, value, ancestor_ids, labels). `container[key]`
+    Returns (container, key, value, ancestor_ids, labels, owner). `container[key]`
     is `value`; `container` is None only when `path` is empty (`value` is
-    then the synthetic list of root objects).
+    then the synthetic list of root objects). `owner` is the innermost Obj
+    whose fields hold `container`, if any.
     """
     value: Any = _roots(bit)
     container = None
     key = None
+    owner: Obj | None = None
     ancestors: set[int] = set()
     labels: list[str] = []
 
@@ -145,6 +148,7 @@ def _walk(bit: int, path: list):
             ancestors.add(id(value))
 
         if isinstance(value, Obj):
+            owner = value
             container = value.fields
             key = elem
             labels.append(str(elem))
@@ -164,7 +168,7 @@ def _walk(bit: int, path: list):
 
         value = container[key]
 
-    return container, key, value, ancestors, labels
+    return container, key, value, ancestors, labels, owner
 
 
 def _path_str(labels: list[str]) -> str:
@@ -194,7 +198,7 @@ def load(data: bytes) -> str:
         info: dict[str, Any] = {"bit": bit, "name": name, "size": len(chunks[bit])}
         if bit in HXBIT_CHUNK_BITS:
             try:
-                hxs = HXSFile.from_bytes(chunks[bit], shims="deadcells")
+                hxs = HXSFile.from_bytes(chunks[bit], shims="deadcells", lazy=True)
                 _state["hxs"][bit] = hxs
                 info["type"] = "hxbit"
                 info["root_count"] = len(_roots(bit))
@@ -244,7 +248,7 @@ def load(data: bytes) -> str:
 
 def tree_children(bit: int, path_json: str, offset: int = 0) -> str:
     path = json.loads(path_json)
-    _, _, value, ancestors, _ = _walk(bit, path)
+    _, _, value, ancestors, _, _ = _walk(bit, path)
     if isinstance(value, (Obj, dict, list)):
         ancestors = ancestors | {id(value)}
 
@@ -282,7 +286,7 @@ def tree_children(bit: int, path_json: str, offset: int = 0) -> str:
 
 def tree_node(bit: int, path_json: str) -> str:
     path = json.loads(path_json)
-    container, _, value, ancestors, labels = _walk(bit, path)
+    container, _, value, ancestors, labels, _ = _walk(bit, path)
     is_cycle = isinstance(value, (Obj, dict, list)) and id(value) in ancestors
 
     result: dict[str, Any] = {
@@ -297,10 +301,10 @@ def tree_node(bit: int, path_json: str) -> str:
         return json.dumps(result)
 
     if isinstance(value, Obj):
-        detail = value.pprint()
-        if len(detail) > 200_000:
-            detail = detail[:200_000] + "\n… (truncated; expand the tree to inspect nested values)"
-        result["detail"] = detail
+        detail = io.StringIO()
+        if value.pprint_to(detail, max_chars=200_000):
+            detail.write("\n… (truncated; expand the tree to inspect nested values)")
+        result["detail"] = detail.getvalue()
     elif isinstance(value, (dict, list)):
         result["detail"] = reprlib.Repr(maxlevel=3, maxdict=20, maxlist=20, maxstring=120, maxother=120).repr(value)
     else:
@@ -313,18 +317,16 @@ def tree_node(bit: int, path_json: str) -> str:
 
 def set_value(bit: int, path_json: str, type_name: str, raw_value: str) -> str:
     path = json.loads(path_json)
-    container, key, _, _, _ = _walk(bit, path)
+    container, key, _, _, _, owner = _walk(bit, path)
     if container is None:
         raise ValueError("This node is not editable.")
 
     new_value = _parse_scalar(type_name, raw_value)
     container[key] = new_value
-
-    hxs = _state["hxs"][bit]
-    # Force serialise() to re-encode from the typed object graph instead of
-    # falling back to the preserved raw payload.
-    hxs.object_parse_error = None
-    hxs.raw_object_data = None
+    # Edits inside a nested list or dict aren't seen by the field tracking,
+    # and serialise() only re-encodes dirty objects.
+    if owner is not None:
+        owner.mark_dirty()
 
     return tree_node(bit, path_json)
 